@@ -0,0 +1,17 @@
+from .registry import ALGORITHMS, centerpoint, get_algorithm
+
+# Names, that are imported (and thus numpy) only when they are used, by
+# their module
+_LAZY = {
+    "centerpoint_by_group": "grouping",
+    "StreamingRadon": "streaming",
+    "SlidingWindowRadon": "streaming",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        return getattr(import_module("." + _LAZY[name], __name__), name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
@@ -0,0 +1,174 @@
+"""
+The asyncio interface of the algorithms, see
+CenterpointAlgo.centerpoint_async.
+
+Every call computes with a copy of the algorithm, that samples from a child
+stream of the algorithm's generator, so concurrent calls don't share a
+generator. Calls with at most SMALL_REQUEST points, that arrive within
+COALESCE_DELAY seconds for the same algorithm and executor, are coalesced
+into one centerpoint_each call, e.g. the batched radon rounds of
+IteratedRadon.
+"""
+import asyncio
+import copy
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from .parallel import spawn
+
+# Point sets up to this size are coalesced.
+SMALL_REQUEST = 10000
+# Coalesce up to MAX_BATCH calls, arriving within COALESCE_DELAY seconds.
+MAX_BATCH = 64
+COALESCE_DELAY = 0.002
+
+# The coalescers of every event loop by algorithm and executor. A coalescer
+# is removed, once it has no pending or running calls.
+_coalescers = weakref.WeakKeyDictionary()
+
+
+async def centerpoint_async(algo, points, executor=None):
+    """
+    Return the centerpoint of points computed by algo in the executor (by
+    default the event loop's thread pool), see
+    CenterpointAlgo.centerpoint_async.
+    """
+    points = np.asanyarray(points)
+    if points.ndim == 2 and 0 < len(points) <= SMALL_REQUEST:
+        return await _coalescer(algo, executor).submit(points)
+    return await _run(algo, "centerpoint", (points, ), executor)
+
+
+async def _run(algo, method, args, executor):
+    # Call a method of a copy of algo in the executor. If the call is
+    # cancelled, the computation is cancelled by the event, too. A process
+    # executor would get a copy of the event, so there only pending calls
+    # are cancelled.
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):
+        cancel = None
+    else:
+        cancel = threading.Event()
+
+    func = getattr(_fork(algo), method)
+    try:
+        return await loop.run_in_executor(executor,
+                                          partial(func, *args, cancel=cancel))
+    except asyncio.CancelledError:
+        if cancel is not None:
+            cancel.set()
+        raise
+
+
+def _fork(algo):
+    # Return a copy of algo, that samples from a child stream of its
+    # generator.
+    forked = copy.copy(algo)
+    forked._rng = np.random.default_rng(spawn(algo._rng, 1)[0])
+    return forked
+
+
+def _coalescer(algo, executor):
+    coalescers = _coalescers.setdefault(asyncio.get_running_loop(), {})
+    key = (algo, executor)
+
+    def release(coalescer):
+        if coalescers.get(key) is coalescer:
+            del coalescers[key]
+
+    if key not in coalescers:
+        coalescers[key] = _Coalescer(algo, executor, release)
+    return coalescers[key]
+
+
+class _Coalescer:
+    """
+    Collect the calls of an algorithm and executor and compute those of the
+    same dimension as one batch. Once it is idle, release(coalescer) is
+    called.
+    """
+
+    def __init__(self, algo, executor, release):
+        self._algo = algo
+        self._executor = executor
+        self._release = release
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    def submit(self, points):
+        """Return an asyncio future of the centerpoint of points."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((points, future))
+
+        if len(self._pending) >= MAX_BATCH:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(COALESCE_DELAY, self._flush)
+        return future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+
+        groups = {}
+        for points, future in pending:
+            if not future.cancelled():
+                groups.setdefault(points.shape[1], []).append((points,
+                                                              future))
+
+        for group in groups.values():
+            # Keep a reference to the running batches.
+            task = asyncio.ensure_future(self._compute(group))
+            self._tasks.add(task)
+            task.add_done_callback(self._done)
+        self._check_idle()
+
+    def _done(self, task):
+        self._tasks.discard(task)
+        self._check_idle()
+
+    def _check_idle(self):
+        if not self._pending and not self._tasks:
+            self._release(self)
+
+    async def _compute(self, group):
+        point_sets = [points for points, _ in group]
+        futures = [future for _, future in group]
+        batch = asyncio.ensure_future(_run(self._algo, "centerpoint_each",
+                                           (point_sets, ), self._executor))
+
+        # Cancel the batch, once all its calls are cancelled.
+        def cancelled(_):
+            if all(future.cancelled() for future in futures):
+                batch.cancel()
+
+        for future in futures:
+            future.add_done_callback(cancelled)
+
+        try:
+            results = await batch
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            return
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, (error, result) in zip(futures, results):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
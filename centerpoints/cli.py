@@ -1,12 +1,9 @@
 import argparse
+import os
 import sys
-import csv
-import json
 
-from .iterated_radon import IteratedRadon
-from .iterated_tverberg import IteratedTverberg
-from .helpers import has_valid_dimension, has_valid_type, NumpyAwareJSONEncoder
-from .benchmark import benchmark
+# The algorithms, readers (and numpy) are imported by main only when they are
+# needed, which keeps the start-up fast, e.g. for --help.
 
 
 def parse_arguments(argv):
@@ -29,7 +26,7 @@ def parse_arguments(argv):
                              "(timings, results).")
 
     algo_group = parser.add_argument_group("Algorithms")
-    algo_group_algos = algo_group.add_mutually_exclusive_group(required=True)
+    algo_group_algos = algo_group.add_mutually_exclusive_group()
     algo_group_algos.add_argument("--radon", "--iterated-radon", "-1",
                                   action="store_true",
                                   help="Use the IteratedRadon algorithm "
@@ -49,10 +46,23 @@ def parse_arguments(argv):
                                   "Alogrithm 1.")
     # radon_group.add_argument("--radon-tree-height" ...)
 
-    parser.add_argument("points", type=argparse.FileType('r'),
-                        metavar="POINTS",
-                        help='File containing the points (see also Input'
-                             'Formats). To read from stdin use "-".')
+    serve_group = parser.add_argument_group("Worker mode")
+    serve_group.add_argument("--serve-stdio", action="store_true",
+                             help="Keep running and answer newline delimited "
+                                  "json requests from stdin, see "
+                                  "centerpoints.service. POINTS is omitted, "
+                                  "the chosen algorithm (and --radon-tree) "
+                                  "is the default of the requests.")
+    serve_group.add_argument("--workers", type=int, default=None,
+                             metavar="NUM",
+                             help="Compute up to NUM requests concurrently. "
+                                  "The responses keep the order of the "
+                                  "requests.")
+
+    parser.add_argument("points", metavar="POINTS", nargs="?",
+                        help='File containing the points (see also Input '
+                             'Formats), optionally compressed with gzip, bz2 '
+                             'or xz. To read from stdin use "-".')
 
     format_group = parser.add_argument_group("Input format")
     format_group = format_group.add_mutually_exclusive_group(required=False)
@@ -61,74 +71,87 @@ def parse_arguments(argv):
                                    " (default: \\t) (default).")
     format_group.add_argument("--json", action="store_true",
                               help="Read from a json file.")
+    format_group.add_argument("--npy", action="store_true",
+                              help="Read from a numpy .npy file. The file is "
+                                   "memory-mapped instead of loaded.")
 
     args = parser.parse_args(argv)
 
+    if not args.serve_stdio:
+        if not (args.radon or args.tverberg or args.mulzer):
+            parser.error("one of the arguments --radon --tverberg --mulzer "
+                         "is required")
+        if args.points is None:
+            parser.error("the following arguments are required: POINTS")
+        if args.workers is not None:
+            parser.error("argument --workers: requires --serve-stdio")
+    elif args.mulzer:
+        parser.error("argument --mulzer: not supported by --serve-stdio")
+
+    if args.points not in (None, "-") and not os.path.exists(args.points):
+        parser.error("can't open '{}'".format(args.points))
+
     # Cleanup format
     if args.json:
         args.format = "json"
+    elif args.npy:
+        args.format = "npy"
     else:
         args.format = "csv"
 
     args.separator = args.csv
-    del args.json, args.csv
+    del args.json, args.npy, args.csv
 
     return args
 
 
-def read_points_csv(file, delimiter):
-    reader = csv.reader(file, delimiter=delimiter)
-
-    points = []
-    for row in reader:
-        # Transform strings to floats, assuming they are . separated.
-        # TODO: throw custom error if reading failed
-        point = list(map(float, row))
-        points.append(point)
-
-    return points
-
-
-def read_points_json(file):
-    # Load the json file and convert ints to float.
-    # TODO: throw custom error if reading failed
-    points = json.load(file, parse_int=float)
-
-    return points
-
-
 def main():
+    # "serve" starts the server, see server.main.
+    if sys.argv[1:2] == ["serve"]:
+        from .server import main as serve
+        serve(sys.argv[2:])
+        return
+
     # Initialize and parse the arguments.
     options = parse_arguments(sys.argv[1:])
 
-    # Read the points from the file.
-    try:
-        if options.format == "csv":
-            points = read_points_csv(options.points, options.separator)
-        elif options.format == "json":
-            points = read_points_json(options.points)
-    finally:
-        options.points.close()
-
-    # Validate the dimension is correct.
-    if not has_valid_dimension(points):
-        raise TypeError("Invalid dimension for some point.")
-
-    # Validate that every point consists of floats.
-    if not has_valid_type(points, float):
-        raise TypeError("Invalid format for some point.")
+    if options.serve_stdio:
+        from .service import serve
+        if options.tverberg:
+            serve(sys.stdin, sys.stdout, options.workers, "tverberg")
+        else:
+            serve(sys.stdin, sys.stdout, options.workers, "radon",
+                  {"use_tree": options.radon_tree})
+        return
+
+    from .readers import read_points_csv, read_points_json, read_points_npy
+    from .registry import get_algorithm
+
+    # Read the points from the file into a (n, d)-array. The readers
+    # validate the dimension and format of the points.
+    # Compressed files are decompressed while reading.
+    if options.format == "csv":
+        points = read_points_csv(options.points, options.separator)
+    elif options.format == "json":
+        points = read_points_json(options.points)
+    elif options.format == "npy":
+        points = read_points_npy(options.points)
 
     algorithm = None
     if options.radon:
-        algorithm = IteratedRadon(options.radon_tree)
+        algorithm = get_algorithm("radon", use_tree=options.radon_tree)
 
     elif options.tverberg:
-        algorithm = IteratedTverberg()
+        algorithm = get_algorithm("tverberg")
 
     elif options.mulzer:
         raise NotImplementedError()
 
+    import json
+    from .helpers import NumpyAwareJSONEncoder
+
     if options.benchmark > 0:
+        from .benchmark import benchmark
         result = benchmark(algorithm, points, options.benchmark)
 
         json.dump(result, sys.stdout,
@@ -141,12 +164,14 @@ def main():
         result = algorithm.centerpoint(points)
 
         # TODO: discuss if this is our intent?
-        if options.format == "csv":
+        if options.format in ("csv", "npy"):
+            import csv
             writer = csv.writer(sys.stdout, delimiter=options.separator)
             writer.writerow(result)
 
         elif options.format == "json":
             json.dump(result, sys.stdout,
+                      cls=NumpyAwareJSONEncoder,
                       # indent=4, separators=(',', ': ')
                       )
             print()  # \n
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def centerpoint_by_group(points, labels, algo=None):
+    """
+    Return the centerpoint of the points of every label.
+
+    The points are sorted by their labels once (unless they already are)
+    and the segments of all labels are passed to algo.centerpoint_segments,
+    so IteratedRadon runs the radon rounds of all groups together.
+
+    Parameters
+    ----------
+    points : (n, d)-array_like
+    labels : (n, )-array_like
+        the label of every point
+    algo : CenterpointAlgo
+        the algorithm to use, IteratedRadon by default
+
+    Returns
+    -------
+    the sorted unique labels as a (k, )-ndarray and their centerpoints as a
+    (k, d)-ndarray.
+    """
+    if algo is None:
+        from .iterated_radon import IteratedRadon
+        algo = IteratedRadon()
+
+    _points = np.asarray(points)
+    _labels = np.asarray(labels)
+    if _labels.shape != _points.shape[:1]:
+        raise ValueError("Expected one label per point, got {} labels for "
+                         "{} points".format(len(_labels), len(_points)))
+
+    if len(_labels) == 0:
+        return _labels, np.empty((0, ) + _points.shape[1:])
+
+    if np.any(_labels[1:] < _labels[:-1]):
+        order = np.argsort(_labels, kind="stable")
+        _points = _points[order]
+        _labels = _labels[order]
+
+    starts = np.flatnonzero(np.r_[True, _labels[1:] != _labels[:-1]])
+    stops = np.r_[starts[1:], len(_labels)]
+
+    return _labels[starts], algo.centerpoint_segments(_points, starts, stops)
@@ -1,7 +1,24 @@
+from concurrent.futures import CancelledError
+
+import numpy as np
+
+
 class CenterpointAlgo:
     """super class of all centerpoint algorithms. Not stable yet."""
 
-    def centerpoint(self, points):
+    def __init__(self, rng=None):
+        """
+        Parameters
+        ----------
+        rng : numpy.random.Generator, int or None
+            the generator the algorithm draws its random numbers from, or a
+            seed of a new one, see numpy.random.default_rng. Instances don't
+            share the global random state, so they run concurrently and
+            reproducibly.
+        """
+        self._rng = np.random.default_rng(rng)
+
+    def centerpoint(self, points, cancel=None):
         """
         Return the centerpoint of `points` or an approximation of it
 
@@ -9,9 +26,110 @@ class CenterpointAlgo:
         ----------
         points : array_like
             a sequence of n-dimensional points
+        cancel : threading.Event or None
+            checked between the iterations (e.g. the radon rounds), once it
+            is set, a concurrent.futures.CancelledError is raised, see
+            check_cancelled
 
         Examples
         --------
         >>> centerpoint([[1.0, 2.0, 5.0], [3.0, 4.0, 5.0], [1.0, 8.0, 4.0]])
         """
         pass
+
+    def centerpoint_many(self, point_sets, cancel=None):
+        """
+        Return the centerpoints (or approximations) of many independent
+        point sets as a (k, d)-ndarray.
+
+        Parameters
+        ----------
+        point_sets : sequence of array_like
+            k sets of d-dimensional points, e.g. a (k, n, d)-array. Sets of
+            different sizes are allowed.
+        cancel : threading.Event or None
+            see centerpoint
+        """
+        return np.array([self.centerpoint(points, cancel)
+                         for points in point_sets])
+
+    def centerpoint_segments(self, points, starts, stops, cancel=None):
+        """
+        Return the centerpoints of the segments points[start:stop] of a
+        point array as a (k, d)-ndarray.
+
+        Parameters
+        ----------
+        points : (n, d)-array_like
+        starts, stops : (k, )-array_like
+            the bounds of the k segments
+        cancel : threading.Event or None
+            see centerpoint
+        """
+        _points = np.asarray(points)
+        return self.centerpoint_many([_points[start:stop] for start, stop
+                                      in zip(starts, stops)], cancel)
+
+    def centerpoint_each(self, point_sets, cancel=None):
+        """
+        Return the centerpoints of many point sets like centerpoint_many,
+        but as a list of (error, centerpoint) pairs, where error is None or
+        the exception of the set. If the batch fails, every set is computed
+        on its own, so only the invalid sets fail.
+
+        Parameters
+        ----------
+        point_sets : sequence of array_like
+            see centerpoint_many
+        cancel : threading.Event or None
+            see centerpoint, a CancelledError is raised, not returned
+        """
+        try:
+            return [(None, center)
+                    for center in self.centerpoint_many(point_sets, cancel)]
+        except CancelledError:
+            raise
+        except Exception as e:
+            if len(point_sets) == 1:
+                return [(e, None)]
+
+        results = []
+        for points in point_sets:
+            try:
+                results.append((None, self.centerpoint(points, cancel)))
+            except CancelledError:
+                raise
+            except Exception as e:
+                results.append((e, None))
+        return results
+
+    async def centerpoint_async(self, points, executor=None):
+        """
+        Return the centerpoint of `points` like centerpoint, but computed by
+        an executor, so the event loop keeps running, e.g.
+
+            center = await algo.centerpoint_async(points)
+
+        Concurrent calls with small point sets are coalesced into batches,
+        see aio. Cancelling the call stops the computation at the next
+        radon round, or before it starts in a process executor.
+
+        Parameters
+        ----------
+        points : array_like
+            a sequence of n-dimensional points
+        executor : concurrent.futures.Executor or None
+            a thread or process pool, by default the event loop's default
+            executor (a thread pool)
+        """
+        from .aio import centerpoint_async
+        return await centerpoint_async(self, points, executor)
+
+
+def check_cancelled(cancel):
+    """
+    Raise a concurrent.futures.CancelledError, if the threading.Event cancel
+    is set. Without an event (None), nothing happens.
+    """
+    if cancel is not None and cancel.is_set():
+        raise CancelledError()
@@ -1,38 +1,121 @@
 from math import log, ceil
 
 import numpy as np
-from .interfaces import CenterpointAlgo
+from .interfaces import CenterpointAlgo, check_cancelled
 from .helpers import chunks
-from .lib import radon_point, sample_with_replacement, radon_partition
+from .lib import DEFAULT_CHUNK_SIZE, radon_partition, radon_tree, \
+    sample_bounded_indices, sample_with_replacement
+from .parallel import get_backend
 
 
 class IteratedRadon(CenterpointAlgo):
-    def __init__(self, use_tree=False):
+    def __init__(self, use_tree=False, method="svd",
+                 chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                 executor="process", rng=None):
+        """
+        If workers is set, the radon rounds and trees are split across a
+        pool of that many processes or threads, depending on the executor
+        ("process" or "thread"), see parallel.get_backend.
+
+        The points are sampled from rng (a numpy.random.Generator or seed).
+        The workers sample from child streams spawned from it, so a seeded
+        run is reproducible with any executor and number of workers.
+        """
+        super().__init__(rng)
         self._use_tree = use_tree
+        self._method = method
+        self._chunk_size = chunk_size
+        self._workers = workers
+        self._executor = executor
 
-    def centerpoint(self, points):
+    def centerpoint(self, points, cancel=None):
         if self._use_tree:
-            return self._algo1(points)
+            return self._algo1(points, cancel)
         else:
-            return self._algo4(points)
+            return self._algo4(points, cancel)
+
+    def centerpoint_many(self, point_sets, cancel=None):
+        """
+        Return the centerpoints of many point sets as a (k, d)-ndarray.
+
+        All sets are processed together: every radon round (or tree level)
+        of all sets is one batch of radon points, split across the workers
+        like the rounds of a single set. Sets of different sizes are
+        concatenated and computed as segments, see centerpoint_segments.
+        """
+        if not isinstance(point_sets, np.ndarray):
+            try:
+                point_sets = np.array(point_sets, dtype=float)
+            except ValueError:
+                # The sets differ in size
+                sets = [np.asarray(points, dtype=float)
+                        for points in point_sets]
+                stops = np.cumsum([len(points) for points in sets])
+                starts = np.concatenate(([0], stops[:-1]))
+                return self.centerpoint_segments(np.concatenate(sets),
+                                                 starts, stops, cancel)
+
+        if point_sets.ndim != 3:
+            return super().centerpoint_many(point_sets, cancel)
+
+        k, n, dim = point_sets.shape
+        starts = np.arange(k) * n
+        return self.centerpoint_segments(point_sets.reshape((k * n, dim)),
+                                         starts, starts + n, cancel)
+
+    def centerpoint_segments(self, points, starts, stops, cancel=None):
+        """
+        Return the centerpoints of the sets points[start:stop] of all
+        segments at once, see centerpoint_many. The segments may be in any
+        order and overlap.
+        """
+        points = _population(points)
+        starts = np.asarray(starts)
+        stops = np.asarray(stops)
+        bounds = np.column_stack((starts, stops))
+        dim = points.shape[1]
+
+        if self._use_tree:
+            check_cancelled(cancel)
+            L = (dim + 2) ** 4
+            ids = sample_bounded_indices(bounds, L, self._rng)
+            return radon_tree(points[ids], self._method, self._rng)
+
+        # The smallest set must be large enough, the largest one needs the
+        # most rounds.
+        sizes = stops - starts
+        z = max(self._rounds(sizes.min(), dim), self._rounds(sizes.max(), dim))
+
+        # The population of the i-th segment takes sizes[i] slots starting
+        # at offsets[i]. The first round samples from the segments of the
+        # points, the others from the slots of the population.
+        offsets = np.cumsum(sizes) - sizes
+        slots = np.column_stack((offsets, offsets + sizes))
+
+        with self._backend() as backend:
+            T = backend.radon_rounds(points, sizes.sum(), 1, self._rng,
+                                     np.repeat(bounds, sizes, axis=0), cancel)
+            T = backend.radon_rounds(T, len(T), z - 1, self._rng,
+                                     np.repeat(slots, sizes, axis=0), cancel)
 
-    def _algo1(self, points):
+        return T[offsets]
+
+    def _algo1(self, points, cancel=None):
         dim = len(points[0])
         # TODO: check L size and required number of points.
         L = (dim + 2) ** 4
 
-        nodes = sample_with_replacement(points, L)
-        while len(nodes) != 1:
-            nodes = [radon_point(chunk) for chunk in chunks(nodes, dim + 2)]
-
-        return nodes[0]
+        check_cancelled(cancel)
+        leaves = sample_with_replacement(points, L, rng=self._rng)
+        with self._backend() as backend:
+            return backend.radon_tree(leaves, self._rng)
 
     def visualisation(self, points, v):
         import centerpoints.visualise as vis
         dim = len(points[0])
         # TODO: check L size and required number of points.
         L = (dim + 2) ** 4
-        nodes = sample_with_replacement(points, L)
+        nodes = sample_with_replacement(points, L, rng=self._rng)
         v.points(nodes, (1, 0.5, 0, 1))
         colorgroup = vis.ColorGroup()
 
@@ -42,7 +125,8 @@ class IteratedRadon(CenterpointAlgo):
             new_nodes = []
             color = colorgroup.next_member()
             for chunk in chunks(nodes, dim + 2):
-                radon_pt, _, (mask_I, mask_J) = radon_partition(chunk)
+                radon_pt, _, (mask_I, mask_J) = \
+                    radon_partition(chunk, self._method)
                 v.add(vis.RadonPartition(chunk[mask_I, :], chunk[mask_J, :],
                                          radon_pt, color))
                 new_nodes.append(radon_pt)
@@ -53,17 +137,32 @@ class IteratedRadon(CenterpointAlgo):
         v.point(nodes[0], (1, 1, 1, 1), 5)
         return nodes[0]
 
-    def _algo4(self, points):
-        dim = len(points[0])
-        n = len(points)
+    def _algo4(self, points, cancel=None):
+        T = _population(points)
+        n, dim = T.shape
+
+        z = self._rounds(n, dim)
 
+        with self._backend() as backend:
+            T = backend.radon_rounds(T, n, z, self._rng, cancel=cancel)
+
+        return T[0]
+
+    @staticmethod
+    def _rounds(n, dim):
+        # Return the number of radon rounds for n points.
         assert (n >= dim ** 4 + log(log(n))), "Not enough points"
 
-        z = ceil(dim + log(log(n)))
+        return ceil(dim + log(log(n)))
 
-        T = points
-        for i in range(z):
-            T = [radon_point(sample)
-                 for sample in sample_with_replacement(T, dim + 2, n)]
+    def _backend(self):
+        return get_backend(self._workers, self._executor, self._method,
+                           self._chunk_size)
 
-        return T[0]
+
+def _population(points):
+    # Memory-mapped points are sampled in place, without loading them. Keep
+    # any other population as a contiguous array for the whole run.
+    if isinstance(points, np.memmap):
+        return points
+    return np.ascontiguousarray(points, dtype=float)
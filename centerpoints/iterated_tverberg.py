@@ -1,172 +1,417 @@
 # -*- coding: utf-8 -*-
 
-from itertools import compress
-
 import numpy as np
-from numpy import log, log10, ceil
+from numpy import log10, ceil
 
-from centerpoints.helpers import pop
-from centerpoints.lib import solve_homogeneous, radon_partition
-from centerpoints.interfaces import CenterpointAlgo
+from centerpoints.lib import DEFAULT_CHUNK_SIZE, solve_homogeneous, \
+    radon_partitions
+from centerpoints.interfaces import CenterpointAlgo, check_cancelled
+from centerpoints.parallel import get_backend
 
 
 class IteratedTverberg(CenterpointAlgo):
-
-    def centerpoint(self, points):
+    def __init__(self, method="svd", proof=True, workers=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, rng=None):
+        """
+        If proof is False, the points are moved through the buckets without
+        building and pruning the proofs of their depth. This is faster, but
+        pruned points don't return to B_0.
+
+        If workers is set, the radon partitions and the pruning of each
+        bucket level are split in blocks of at most chunk_size groups
+        across a pool of that many threads.
+
+        The algorithm is deterministic, rng is accepted for the common
+        interface only.
+        """
+        super().__init__(rng)
+        self._method = method
+        self._proof = proof
+        self._workers = workers
+        self._chunk_size = chunk_size
+
+    def centerpoint(self, points, cancel=None):
+        with get_backend(self._workers, "thread", self._method,
+                         self._chunk_size) as backend:
+            return self._centerpoint(points, backend, cancel)
+
+    def _centerpoint(self, points, backend, cancel=None):
         points = np.asarray(points)
         n, d = points.shape
 
         # The loop terminates when a point is in the bucket B_z
         z = int(log10(ceil(n / (2 * ((d + 1) ** 2)))))
-        # or if the paper has a typo 
+        # or if the paper has a typo
         # z = int(ceil(log10(n / (2 * ((d + 1) ** 2)))))
 
+        if z == 0:
+            return points[0].astype(float)
 
-        # Initialize empty stacks / buckets
-        B = [[] for l in range(z+1)]
-
-        # Push initial points with trivial proofs
-        # Proofs consist of a factor and a hull.
-        for s in points:
-            # TODO (one could copy the proof to be save)
-            proof = [(1, s)]
-            B[0].append((s, [proof]))
+        # Initialize the buckets and push the initial points with trivial
+        # proofs.
+        B = _Buckets(n, d, z, self._proof)
 
         while len(B[z]) == 0:
-            # Initialize proof to be an empty stack
-            proof = []
-
-            # Let l be the max such that B_l−1 has at least d + 2 points
-            # ToDO: optimize?
-            l = find_l(B, d)
-
-            # Pop d + 2 points q_1 , . . . , q_d+2 from B_l−1
-            # qs denotes the list of points q_1 to q_d+2
-            # qss denotes the collection of proofs for each point q_i
-            qs_with_proof = pop(B[l-1], d + 2)
-            qs, pss = zip(*qs_with_proof)
-
-            # TODO: the proof parts should be "ordered" according to the paper
-
-            # Calculate the radon partition
-            radon_pt, alphas, partition_masks = radon_partition(qs)
-
-            for k in range(2):
-                # qs_part denotes the list of points in this partition
-                # qs_part = list(compress(qs, partition_masks[k]))
-
-                # pss_part denotes the collection of proofs for that points
-                pss_part = list(compress(pss, partition_masks[k]))
-
-                # as_part denotes the factors of the radon point in regard to
-                # the hulls consisting of the partitions
-                as_part = alphas[k]
-
-                # Form a proof of depth 2^(l+1) for the radon point
-                for i in range(2 ** (l - 1)):
-
-                    # Union the i'th part of each proof of each point
-                    X_alphas = []
-                    X_hulls = []
-                    for j, ps in enumerate(pss_part):
-                        S_ij = ps[i]
-
-                        for ppt in S_ij:
-                            # Adjust the factors of the proofs to be able to
-                            # describe the radon point as a combination of it's
-                            # proofs.
-                            alpha = as_part[j] * ppt[0]
-                            hull = ppt[1]
-
-                            # Add them to the new proof
-                            X_alphas.append(alpha)
-                            X_hulls.append(hull)
-
-                    # Reduce the hull of the radon point, that is consisting
-                    # of the proof parts, to d + 1 hull points.
-                    X2, non_hull = _prune_zipped(X_alphas, X_hulls)
-
-                    proof.append(X2)
-                    B[0].extend(non_hull)
-
-            B[l].append((radon_pt, proof))
-
-        return B[z][0][0]
-
-
-# Let l be the max such that B_l−1 has at least d + 2 points
-def find_l(B, d):
-    l = None
-    for i, b in enumerate(B):
-        if len(b) >= d + 2:
-            l = i
-
-    assert (l != None), "No bucket with d+2 points found"
-
-    return l + 1
-
-
-def _prune_zipped(alphas, hull):
-    _alphas = np.asarray(alphas)
-    _hull = np.asarray(hull)
-    alphas, hull, non_hull = _prune_recursive(_alphas, _hull, [])
-
-    assert (alphas.shape[0] == hull.shape[0]), "Broken hull"
-
-    non_hull = [(p, [[(1, p)]]) for p in non_hull]
-
-    return zip(alphas, hull), non_hull
-
-
-def _prune_recursive(alphas, hull, non_hull):
-    # Remove all coefficients that are already (close to) zero.
-    idx_nonzero = ~ np.isclose(alphas, np.zeros_like(alphas))  # alphas != 0
-    alphas = alphas[idx_nonzero]
-
-    # Add pruned points to the non hull (and thus back to bucket B_0)
-    non_hull = non_hull + hull[~idx_nonzero].tolist()
-
-    hull = hull[idx_nonzero]
-
+            check_cancelled(cancel)
+            self._step(B, points, z, backend)
+
+        return B[z].points[0].copy()
+
+    def _step(self, B, points, z, backend):
+        """
+        Pop the groups of the highest bucket with at least d + 2 points and
+        push their radon points (with proofs) one bucket up.
+        """
+        d = points.shape[1]
+
+        # Let l be the max such that B_l−1 has at least d + 2 points
+        l = B.find_l()
+
+        # Pop all groups of d + 2 points q_1 , . . . , q_d+2 from B_l−1,
+        # but not more than needed to reach B_z.
+        # qs denotes the groups of points q_1 to q_d+2
+        # qs_alphas and qs_hulls denote the proofs for each point q_i
+        n_groups = min(len(B[l - 1]) // (d + 2), (d + 2) ** (z - l))
+        if l == 1:
+            ids = B.pop(0, n_groups).reshape((n_groups, d + 2))
+            qs = points[ids]
+            qs_alphas = np.ones((n_groups, d + 2, 1, 1))
+            qs_hulls = ids[:, :, None, None]
+        else:
+            qs, qs_alphas, qs_hulls = B.pop(l - 1, n_groups)
+            qs = qs.reshape((n_groups, d + 2, d))
+            if self._proof:
+                shape = (n_groups, d + 2) + qs_alphas.shape[1:]
+                qs_alphas = qs_alphas.reshape(shape)
+                qs_hulls = qs_hulls.reshape(shape)
+
+        # TODO: the proof parts should be "ordered" according to the paper
+
+        # Calculate the radon partitions of all groups
+        radon_pts, alphas, masks = backend.map_blocks(
+            radon_partitions, qs, method=self._method)
+
+        if not self._proof:
+            B.push(l, radon_pts)
+            return
+
+        sides = np.stack((masks, ~ masks), axis=1)[:, :, :, None, None]
+
+        # Adjust the factors of the proofs to be able to describe the
+        # radon points as a combination of their proofs.
+        X_alphas = np.where(sides, alphas[:, None, :, None, None] *
+                            qs_alphas[:, None], 0)
+        X_hulls = np.where(sides, qs_hulls[:, None], -1)
+
+        # Union the i'th part of each proof of each point of a partition:
+        # (groups, partitions, points, parts, hull)
+        #   -> (groups * partitions * parts, hull)
+        n_parts = 2 * X_hulls.shape[3]
+        X_alphas = X_alphas.transpose(0, 1, 3, 2, 4)
+        X_alphas = X_alphas.reshape((n_groups * n_parts, -1))
+        X_hulls = X_hulls.transpose(0, 1, 3, 2, 4)
+        X_hulls = X_hulls.reshape((n_groups * n_parts, -1))
+
+        # Form proofs of depth 2^(l+1) for the radon points by reducing
+        # the hull of each part to d + 1 hull points.
+        proof_alphas, proof_hulls, non_hull = backend.map_blocks(
+            _prune, X_alphas, X_hulls, points=points, method=self._method)
+        B.push(0, non_hull)
+
+        B.push(l, radon_pts,
+               proof_alphas.reshape((n_groups, n_parts, d + 1)),
+               proof_hulls.reshape((n_groups, n_parts, d + 1)))
+
+
+class _Buckets:
+    """
+    The buckets B_0, ..., B_z. B_0 holds the indices of the n input points,
+    which have trivial proofs. B_l holds radon points with proofs of depth
+    2^l (or without proofs).
+
+    The levels with at least d + 2 points are tracked in a bitmask, which is
+    updated on every push and pop.
+    """
+
+    def __init__(self, n, d, z, proof=True):
+        self._d = d
+        self._stacks = [_IndexStack(n)]
+        self._stacks.extend(_ProofStack(d, 2 ** l if proof else None)
+                            for l in range(1, z + 1))
+        self._ready = 0
+
+        self.push(0, np.arange(n))
+
+    def __getitem__(self, l):
+        return self._stacks[l]
+
+    def find_l(self):
+        """Return l, such that B_l−1 is the max with at least d + 2 points."""
+        assert (self._ready != 0), "No bucket with d+2 points found"
+        return self._ready.bit_length()
+
+    def push(self, l, *items):
+        """Push the stacked items to B_l."""
+        self._stacks[l].push(*items)
+        self._update(l)
+
+    def pop(self, l, n_groups=1):
+        """
+        Pop n_groups groups of d + 2 items from B_l. The items are returned
+        as stacks, which are in the order of popping.
+        Throws IndexError if B_l has not enough items.
+        """
+        items = self._stacks[l].pop(n_groups * (self._d + 2))
+        self._update(l)
+        return items
+
+    def _update(self, l):
+        if len(self._stacks[l]) >= self._d + 2:
+            self._ready |= 1 << l
+        else:
+            self._ready &= ~ (1 << l)
+
+
+class _IndexStack:
+    """A stack of indices of input points, stored in an array."""
+
+    def __init__(self, capacity):
+        self.ids = np.empty(capacity, dtype=np.intp)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, ids):
+        size = self._size + len(ids)
+        if size > len(self.ids):
+            self.ids = _grow(self.ids, size)
+        self.ids[self._size:size] = ids
+        self._size = size
+
+    def pop(self, n):
+        """Pop n indices. Throws IndexError if len(self) < n."""
+        if n > self._size:
+            raise IndexError("pop from a too small stack")
+        self._size -= n
+        return self.ids[self._size:self._size + n][::-1].copy()
+
+
+class _ProofStack:
+    """
+    A stack of radon points together with their proofs of n_parts parts,
+    stored in preallocated arrays, which grow if necessary.
+    If n_parts is None, only the points are stored.
+    """
+
+    def __init__(self, d, n_parts, capacity=None):
+        capacity = d + 2 if capacity is None else capacity
+        self.points = np.empty((capacity, d))
+        self.alphas = self.hulls = None
+        if n_parts is not None:
+            self.alphas = np.empty((capacity, n_parts, d + 1))
+            self.hulls = np.empty((capacity, n_parts, d + 1), dtype=np.intp)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, points, alphas=None, hulls=None):
+        """Push the stacked points together with their proofs."""
+        proof = self.alphas is not None
+        size = self._size + len(points)
+        if size > len(self.points):
+            self.points = _grow(self.points, size)
+            if proof:
+                self.alphas = _grow(self.alphas, size)
+                self.hulls = _grow(self.hulls, size)
+
+        self.points[self._size:size] = points
+        if proof:
+            self.alphas[self._size:size] = alphas
+            self.hulls[self._size:size] = hulls
+        self._size = size
+
+    def pop(self, n):
+        """
+        Pop n points and return copies of the points, the factors and the
+        hull indices (None without proofs).
+        Throws IndexError if len(self) < n.
+        """
+        if n > self._size:
+            raise IndexError("pop from a too small stack")
+        self._size -= n
+        top = slice(self._size + n - 1, None if self._size == 0
+                    else self._size - 1, -1)
+        if self.alphas is None:
+            return self.points[top].copy(), None, None
+        return (self.points[top].copy(), self.alphas[top].copy(),
+                self.hulls[top].copy())
+
+
+def _grow(array, size):
+    """Return a copy of array with room for at least size entries."""
+    capacity = max(size, 2 * len(array))
+    grown = np.empty((capacity, ) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+# Factors up to this magnitude are considered to be zero.
+_ATOL = 1e-8
+
+
+def _prune(alphas, hulls, points, method="svd"):
+    """
+    Reduce k convex combinations of input points to d + 1 points each,
+    according to Carathéodory's theorem.
+
+    alphas, hulls : (k, m)-arrays
+        The factors and the indices into points of each combination.
+        Unused entries have the index -1.
+
+    Return the factors and the indices of the reduced combinations as
+    (k, d + 1)-arrays and the indices of all pruned points.
+    """
     # @see http://www.math.cornell.edu/~eranevo/homepage/ConvNote.pdf
     # http://en.wikipedia.org/wiki/Carath%C3%A9odory's_theorem_(convex_hull)
-    n, d = hull.shape
-
-    # Anchor: d + 1 hull points can't be reduced any further
-    if n <= d + 1:
-        return alphas, hull, non_hull
-
-    # Choose d + 2 hull points
-    _hull = hull[:d + 2]
-    _alphas = alphas[:d + 2]
-
-    # Create linearly dependent vectors
-    lindep = _hull[1:] - _hull[1]
-
-    # Solve β * lindep = 0
-    _betas = solve_homogeneous(lindep.T)
-
-    # Calculate β_1 in a way to assure Sum β_i = 0
-    beta1 = np.negative(np.sum(_betas))
-    betas = np.hstack((beta1, _betas))
-
-    # Calculate the adjusted alphas and determine the minimum.
-    # Calculate the minimum fraction α / β_i for each β_i > 0
-    idx_positive = betas > 0
-    idx_nonzero = ~ np.isclose(betas, np.zeros_like(betas))  # betas != 0
-    idx = idx_positive & idx_nonzero
-    lambdas = _alphas[idx] / betas[idx]
-    lambda_min_idx = np.argmin(lambdas)
-
-    # Adjust the α's of the original point
-    # Since _alphas is a view to the original data, the alphas array will be
-    # be updated automatically.
-    _alphas[:] = _alphas - (lambdas[lambda_min_idx] * betas)
-
-    # Remove (filter) the pruned hull vector.
-    idx = np.arange(n) != lambda_min_idx
-    hull = hull[idx]
-    non_hull.append(hull[lambda_min_idx])
-    alphas = alphas[idx]
-
-    return _prune_recursive(alphas, hull, non_hull)
+    d = points.shape[1]
+
+    # Prune all points with factors, that are already (close to) zero.
+    used = hulls >= 0
+    zero = used & (np.abs(alphas) <= _ATOL)
+    pruned = [hulls[zero]]
+    used &= ~ zero
+
+    # Move the used entries to the front of each combination.
+    order = np.argsort(~ used, axis=1, kind="stable")
+    counts = np.sum(used, axis=1)
+    width = max(d + 1, np.max(counts, initial=0))
+    order = order[:, :width]
+    alphas = np.take_along_axis(alphas, order, axis=1)
+    hulls = np.take_along_axis(hulls, order, axis=1)
+    unused = np.arange(width) >= counts[:, np.newaxis]
+    alphas[unused] = 0
+    hulls[unused] = -1
+
+    # The first d + 1 entries form the basis of a combination. The
+    # remaining ones are swapped in one by one.
+    basis_alphas = alphas[:, :d + 1]
+    basis_hulls = hulls[:, :d + 1]
+
+    rows = np.flatnonzero(counts > d + 1)
+    if len(rows) > 0:
+        _alphas, _hulls, _pruned = _prune_bases(
+            alphas[rows], hulls[rows], counts[rows], points, method)
+        basis_alphas[rows] = _alphas
+        basis_hulls[rows] = _hulls
+        pruned.append(_pruned)
+
+    # Swapping may have reduced further factors to zero.
+    zero = (basis_hulls >= 0) & (np.abs(basis_alphas) <= _ATOL)
+    pruned.append(basis_hulls[zero])
+    basis_alphas[zero] = 0
+    basis_hulls[zero] = -1
+
+    return basis_alphas, basis_hulls, np.concatenate(pruned)
+
+
+def _prune_bases(alphas, hulls, counts, points, method="svd"):
+    # Every combination has more than d + 1 used entries in front.
+    k, width = hulls.shape
+    d = points.shape[1]
+    rows = np.arange(k)
+
+    basis_alphas = alphas[:, :d + 1].copy()
+    basis_hulls = hulls[:, :d + 1].copy()
+
+    # basis = | 1    ...  1       |
+    #         | p[1] ...  p[d+1]  |
+    # (d+1) x (d+1) - Matrix of each combination and its inverse, which is
+    # updated by rank-one updates as long as the basis is regular.
+    basis = np.empty((k, d + 1, d + 1))
+    basis[:, 0, :] = 1
+    basis[:, 1:, :] = points[basis_hulls].transpose(0, 2, 1)
+    inverse, regular = _inverse(basis)
+
+    column = np.empty((k, d + 1))
+    betas = np.empty((k, d + 2))
+    _alphas = np.empty((k, d + 2))
+    pruned = []
+
+    for t in range(d + 1, width):
+        # Combinations, that have a (t+1)'th point
+        active = counts > t
+        q = np.where(active, hulls[:, t], 0)
+        column[:, 0] = 1
+        column[:, 1:] = points[q]
+
+        # Solve β * | basis column | = 0 with β_d+2 = 1, that is
+        # β_1..d+1 = - inverse * column
+        w = np.einsum("kij,kj->ki", inverse, column)
+        betas[:, :d + 1] = - w
+        betas[:, d + 1] = 1
+
+        # Singular bases are solved as a whole.
+        singular = active & ~ regular
+        if np.any(singular):
+            M = np.concatenate((basis[singular],
+                                column[singular, :, np.newaxis]), axis=2)
+            betas[singular] = solve_homogeneous(M, method)
+
+        # Calculate the minimum fraction α_i / β_i for each β_i > 0 and
+        # adjust the α's, such that the minimum becomes zero.
+        _alphas[:, :d + 1] = basis_alphas
+        _alphas[:, d + 1] = alphas[:, t]
+        tol = _ATOL * np.max(np.abs(betas), axis=1, keepdims=True)
+        positive = betas > tol
+        lambdas = np.where(positive,
+                           _alphas / np.where(positive, betas, 1), np.inf)
+        j = np.argmin(lambdas, axis=1)
+        _alphas -= lambdas[rows, j, np.newaxis] * betas
+        _alphas[rows, j] = 0
+
+        # Either the new point is pruned or it replaces the j'th basis point.
+        replace = active & (j <= d)
+        _j = np.minimum(j, d)
+        pruned.append(np.where(replace, basis_hulls[rows, _j], q)[active])
+
+        _alphas[replace, _j[replace]] = _alphas[replace, d + 1]
+        basis_alphas[active] = _alphas[active, :d + 1]
+        basis_hulls[replace, _j[replace]] = q[replace]
+        basis[replace, :, _j[replace]] = column[replace]
+
+        # Sherman-Morrison: inverse' = inverse - (w - e_j) * inverse_j / w_j
+        update = replace & regular
+        w_j = w[rows, _j]
+        regular &= ~ (replace & (np.abs(w_j) <= _ATOL))
+        update &= regular
+        if np.any(update):
+            u = w[update]
+            u[np.arange(len(u)), _j[update]] -= 1
+            inverse_j = inverse[update, _j[update]]
+            inverse[update] -= (u[:, :, np.newaxis] * inverse_j[:, None, :] /
+                                w_j[update, None, None])
+
+    return basis_alphas, basis_hulls, np.concatenate(pruned)
+
+
+def _inverse(matrices):
+    """
+    Invert a stack of matrices. Return the inverses and a mask of the
+    regular (and well-conditioned) matrices.
+    """
+    k, n, _ = matrices.shape
+    inverse = np.zeros_like(matrices)
+    try:
+        regular = np.ones(k, dtype=bool)
+        inverse[:] = np.linalg.inv(matrices)
+    except np.linalg.LinAlgError:
+        sign, _ = np.linalg.slogdet(matrices)
+        regular = sign != 0
+        inverse[regular] = np.linalg.inv(matrices[regular])
+
+    identity = np.einsum("kij,kjl->kil", matrices, inverse)
+    error = np.max(np.abs(identity - np.eye(n)), axis=(1, 2))
+    regular &= error <= 1e-8
+    return inverse, regular
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 
+# Number of samples, that are gathered at once by sample_chunks.
+DEFAULT_CHUNK_SIZE = 4096
 
-def _find_alphas(points):
+
+def _find_alphas(points, method="svd"):
     _points = np.asarray(points)
 
     n_points, n_dimensions = _points.shape
@@ -16,15 +19,16 @@ def _find_alphas(points):
 
     equations = np.vstack((np.ones(n_points), _points.T))
 
-    return solve_homogeneous(equations)
+    return solve_homogeneous(equations, method)
 
 
-def radon_partition(points):
+def radon_partition(points, method="svd"):
     """
     Find a radon partition <http://en.wikipedia.org/wiki/Radon%27s_theorem>.
 
     points : (n, d)-array_like
         where n is the number of points and d the dimension of the points
+    method : the null space method, see solve_homogeneous
 
     Return the radon point, the factors for the partition I and the partition J
         and two masking arrays, representing the partitions in reference to the
@@ -38,7 +42,7 @@ def radon_partition(points):
     n, d = _points.shape
     assert (n >= d + 2), "Not enough points"
 
-    alphas = _find_alphas(_points)
+    alphas = _find_alphas(_points, method)
 
     greater_idx = alphas > 0
     greater_alphas = alphas[greater_idx]
@@ -59,18 +63,132 @@ def radon_partition(points):
             (greater_idx, lower_idx))
 
 
-def radon_point(points):
+def radon_partitions(points, method="svd"):
+    """
+    Find the radon partitions of many point groups at once.
+
+    points : (m, n, d)-array_like
+        a stack of m groups, each consisting of n points of dimension d
+    method : the null space method, see solve_homogeneous
+
+    Return the radon points, the factors and a masking array for the
+    partitions I of every group. The factors of a group are normalized, such
+    that alphas[mask_I] and alphas[~mask_I] each sum up to one.
+
+        (radon points), (m, d)
+        (alphas),       (m, n)
+        (mask_I)        (m, n)
+    """
+    _points = np.asarray(points, dtype=float)
+    m, n, d = _points.shape
+    assert (n >= d + 2), "Not enough points"
+
+    # Stack the equations of every group, see _find_alphas.
+    equations = np.empty((m, d + 1, n))
+    equations[:, 0, :] = 1
+    equations[:, 1:, :] = _points.transpose(0, 2, 1)
+
+    alphas = solve_homogeneous(equations, method)
+
+    greater_idx = alphas > 0
+    sum_alphas = np.sum(np.where(greater_idx, alphas, 0), axis=1)
+    alphas = np.abs(alphas) / sum_alphas[:, np.newaxis]
+
+    radon_pts = np.einsum("mn,mnd->md",
+                          np.where(greater_idx, alphas, 0), _points)
+
+    return radon_pts, alphas, greater_idx
+
+
+def radon_points(points, method="svd"):
+    """
+    Find the radon points of many point groups at once.
+    points : (m, n, d)-array_like
+        a stack of m groups, each consisting of n points of dimension d
+    method : the null space method, see solve_homogeneous
+    Return the radon points as a (m, d)-ndarray.
+    """
+    radon_pts, _, _ = radon_partitions(points, method)
+    return radon_pts
+
+
+def radon_point(points, method="svd"):
     """
     Find the `radon point <http://en.wikipedia.org/wiki/Radon%27s_theorem>`.
     points : (n, d)-array_like
         where n is the number of points and d the dimension of the points
+    method : the null space method, see solve_homogeneous
     Return the radon point as a ndarray.
     """
-    radon_pt, _, _ = radon_partition(points)
+    radon_pt, _, _ = radon_partition(points, method)
     return radon_pt
 
 
-def sample_with_replacement(population, k, n=None):
+def radon_round(population, n, method="svd", chunk_size=DEFAULT_CHUNK_SIZE,
+                out=None, rng=None, bounds=None):
+    """
+    Return the radon points of n groups of d + 2 points, that are sampled
+    with replacement from the population. The groups are gathered and solved
+    in chunks of chunk_size groups.
+
+    population : (m, d)-array_like
+    method : the null space method, see solve_homogeneous
+    out : (n, d)-ndarray, the radon points are written into
+    rng : the random state to sample from, see sample_indices
+    bounds : (n, 2)-array_like, if set, the i-th group is sampled from
+        population[start:stop] of the i-th (start, stop) row only
+    """
+    _population = np.asarray(population)
+    d = _population.shape[1]
+    if out is None:
+        out = np.empty((n, d))
+
+    start = 0
+    for chunk in sample_chunks(_population, d + 2, n, chunk_size, rng,
+                               bounds):
+        stop = start + len(chunk)
+        out[start:stop] = radon_points(chunk, method)
+        start = stop
+
+    return out
+
+
+def radon_tree(points, method="svd", rng=None):
+    """
+    Reduce the points level by level to a single radon point. Every level
+    is split into groups of d + 2 nodes and replaced by their radon points.
+
+    If the number of nodes of a level is not a multiple of d + 2, the last
+    group is filled up with nodes sampled with replacement from that level.
+
+    points : (..., n, d)-array_like
+        the leaves of the tree, or a stack of leaves of independent trees
+    method : the null space method, see solve_homogeneous
+    rng : the random state to sample from, see sample_indices
+    Return the radon point of the root (or a stack of roots) as a ndarray.
+    """
+    nodes = np.asarray(points, dtype=float)
+    batch = nodes.shape[:-2]
+    n_nodes, d = nodes.shape[-2:]
+    n_trees = int(np.prod(batch))
+    nodes = nodes.reshape((n_trees, n_nodes, d))
+
+    while n_nodes > 1:
+        n_groups = -(-n_nodes // (d + 2))
+        missing = n_groups * (d + 2) - n_nodes
+        if missing:
+            ids = sample_indices(n_nodes, missing, n_trees, rng)
+            fill = np.take_along_axis(nodes, ids[:, :, None], axis=1)
+            nodes = np.concatenate((nodes, fill), axis=1)
+
+        nodes = radon_points(nodes.reshape(n_trees * n_groups, d + 2, d),
+                             method).reshape((n_trees, n_groups, d))
+        n_nodes = n_groups
+
+    return nodes.reshape(batch + (d, ))
+
+
+def sample_with_replacement(population, k, n=None, rng=None):
     """
     Return a sample of size k with replacements chosen from the population.
     If n is set, an array of size n containing samples of size k is returned.
@@ -78,22 +196,168 @@ def sample_with_replacement(population, k, n=None):
     :param population:
     :param k: size of the sample
     :param n: number of samples
+    :param rng: the random state to sample from, see sample_indices
     :return: n (or 1) samples of size k
     """
-    size = k if n is None else (n, k)
-    ids = np.random.randint(len(population), size=size)
+    ids = sample_indices(len(population), k, n, rng)
     return np.asarray(population)[ids]
 
 
-def solve_homogeneous(M):
+def sample_chunks(population, k, n, chunk_size=DEFAULT_CHUNK_SIZE, rng=None,
+                  bounds=None):
+    """
+    Yield n samples of size k with replacements chosen from the population,
+    in chunks of at most chunk_size samples.
+
+    The chunks are gathered into a reused (chunk_size, k, ...)-buffer of
+    floats, thus a chunk is only valid until the next one is yielded and the
+    memory needed is independent of n.
+
+    :param population: array_like
+    :param k: size of a sample
+    :param n: number of samples
+    :param chunk_size: max number of samples per chunk
+    :param rng: the random state to sample from, see sample_indices
+    :param bounds: (n, 2)-array_like, if set, the i-th sample is chosen from
+                   the (start, stop) range of the i-th row, see
+                   sample_bounded_indices
+    """
+    _population = np.asarray(population)
+    size = len(_population)
+    buffer = np.empty((min(n, chunk_size), k) + _population.shape[1:])
+
+    for start in range(0, n, chunk_size):
+        if bounds is None:
+            ids = sample_indices(size, k, min(chunk_size, n - start), rng)
+        else:
+            ids = sample_bounded_indices(bounds[start:start + chunk_size],
+                                         k, rng)
+        chunk = buffer[:len(ids)]
+        if _population.dtype == chunk.dtype:
+            np.take(_population, ids, axis=0, out=chunk)
+        else:
+            chunk[...] = _population[ids]
+        yield chunk
+
+
+def sample_indices(size, k, n=None, rng=None):
+    """
+    Return the indices of a sample of size k with replacements chosen from a
+    population of the given size.
+    If n is set, an (n, k)-array containing n samples is returned.
+
+    :param size: size of the population
+    :param k: size of the sample
+    :param n: number of samples
+    :param rng: a numpy.random.Generator or RandomState
+                (default: the global state)
+    :return: n (or 1) index samples of size k
+    """
+    shape = k if n is None else (n, k)
+    if isinstance(rng, np.random.Generator):
+        return rng.integers(size, size=shape)
+    rng = np.random if rng is None else rng
+    return rng.randint(size, size=shape)
+
+
+def sample_bounded_indices(bounds, k, rng=None):
+    """
+    Return an (n, k)-array, whose i-th row contains the indices of a sample
+    of size k with replacements chosen from range(start, stop) of the i-th
+    row of bounds.
+
+    :param bounds: (n, 2)-array_like of (start, stop) pairs
+    :param k: size of a sample
+    :param rng: the random state to sample from, see sample_indices
+    """
+    _bounds = np.asarray(bounds)
+    low, high = _bounds[:, :1], _bounds[:, 1:]
+    shape = (len(_bounds), k)
+    if isinstance(rng, np.random.Generator):
+        return rng.integers(low, high, size=shape)
+    rng = np.random if rng is None else rng
+    return rng.randint(low, high, size=shape)
+
+
+NULL_SPACE_METHODS = ("svd", "qr", "lu")
+
+# Relative residual up to which a solution of "qr" or "lu" is accepted.
+_RESIDUAL_TOL = 1e-10
+
+
+def solve_homogeneous(M, method="svd"):
     """
     Return a vector x, that satisfies `M*x = 0`
+    If M is a stack of matrices, a stack of vectors is returned.
+
+    method : one of NULL_SPACE_METHODS
+        "svd" uses the last right-singular vector of M.
+        "qr" uses the last column of Q of a complete QR decomposition of M.T.
+        "lu" solves the leading (r, r)-system of the (r, r+1)-matrix M by a LU
+        decomposition with partial pivoting and sets the last component to 1.
+
+        "qr" and "lu" expect (r, r+1)-matrices, i.e. an one dimensional null
+        space. Other shapes and rank-deficient matrices fall back to "svd".
     """
     assert (isinstance(M, np.ndarray)), "ndarray required"
+    if method not in NULL_SPACE_METHODS:
+        raise ValueError("Unknown null space method: " + str(method))
+
+    rows, cols = M.shape[-2:]
+    if method == "svd" or cols != rows + 1:
+        return _solve_homogeneous_svd(M)
+
+    # Solve every matrix as part of a stack.
+    _M = M.reshape((-1, rows, cols)).astype(float)
+    if method == "qr":
+        x = _solve_homogeneous_qr(_M)
+    else:
+        x = _solve_homogeneous_lu(_M)
+
+    # Fall back to the svd for rank-deficient (or ill-conditioned) matrices.
+    residual = np.linalg.norm(np.einsum("mrc,mc->mr", _M, x), axis=1)
+    scale = np.linalg.norm(_M, axis=(1, 2))
+    invalid = ~ (residual <= _RESIDUAL_TOL * np.maximum(scale, 1))
+    if np.any(invalid):
+        x[invalid] = _solve_homogeneous_svd(_M[invalid])
+
+    return x.reshape(M.shape[:-2] + (cols,))
+
+
+def _solve_homogeneous_svd(M):
     # From: http://campar.in.tum.de/twiki/pub/Chair/
     # TeachingWs05ComputerVision/3DCV_svd_000.pdf
+    # Stacked matrices (..., r, c) are solved at once.
     u, s, vh = np.linalg.svd(M)
-    return vh.T[:, -1]
+    return vh[..., -1, :]
+
+
+def _solve_homogeneous_qr(M):
+    # The last column of Q is orthogonal to the columns of M.T = Q * R.
+    q, r = np.linalg.qr(M.transpose(0, 2, 1), mode="complete")
+    return q[:, :, -1]
+
+
+def _solve_homogeneous_lu(M):
+    # | A b | * | y | = 0  <=>  A * y = -b
+    #           | 1 |
+    m, rows, cols = M.shape
+    A = M[:, :, :-1]
+    b = M[:, :, -1:]
+
+    x = np.empty((m, cols))
+    x[:, -1] = 1
+    try:
+        x[:, :-1] = np.linalg.solve(A, -b)[:, :, 0]
+    except np.linalg.LinAlgError:
+        # At least one A is singular, solve only the others.
+        sign, _ = np.linalg.slogdet(A)
+        regular = sign != 0
+        x[~regular] = np.nan
+        if np.any(regular):
+            x[regular, :-1] = np.linalg.solve(A[regular], -b[regular])[:, :, 0]
+
+    return x / np.linalg.norm(x, axis=1)[:, np.newaxis]
 
 
 def null_space(matrix, eps=1e-15):
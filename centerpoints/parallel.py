@@ -0,0 +1,422 @@
+"""
+Backends to split the radon rounds and trees of IteratedRadon (and the
+batched computations of IteratedTverberg) across several workers.
+"""
+from importlib import import_module
+from math import ceil
+from mmap import mmap
+
+import numpy as np
+
+from .interfaces import check_cancelled
+from .lib import DEFAULT_CHUNK_SIZE, radon_round, radon_tree
+
+# The smallest block of map_blocks, smaller ones don't pay off the task.
+MIN_BLOCK_SIZE = 32
+
+
+class SharedArray:
+    """
+    A ndarray in shared memory. Other processes attach to it by its spec,
+    instead of receiving a pickled copy.
+    """
+
+    def __init__(self, shape, dtype=float, name=None):
+        from multiprocessing import shared_memory
+
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = _attach(name)
+
+        self.array = np.ndarray(shape, dtype, buffer=self._shm.buf)
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+
+    @property
+    def spec(self):
+        """A picklable (name, shape, dtype) tuple to attach to the array."""
+        return self._shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self):
+        """Detach from the memory. The creating process also frees it."""
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MappedArray:
+    """
+    A read-only ndarray mapped from a file, e.g. a .npy file loaded with
+    mmap_mode. Other processes attach to it by its spec and map the file
+    themselves, instead of receiving a copy.
+    """
+
+    def __init__(self, filename, shape, dtype, offset=0):
+        self.array = np.memmap(filename, dtype, "r", offset, shape)
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(*spec)
+
+    @classmethod
+    def from_memmap(cls, array):
+        """
+        Return the MappedArray of a np.memmap, or None if the array doesn't
+        map a whole C-contiguous file region (e.g. a slice of one).
+        """
+        if not isinstance(array, np.memmap) or \
+                not isinstance(array.base, mmap) or \
+                not array.flags.c_contiguous:
+            return None
+
+        mapped = cls.__new__(cls)
+        mapped.array = array
+        return mapped
+
+    @property
+    def spec(self):
+        """A picklable (filename, shape, dtype, offset) tuple."""
+        return (self.array.filename, self.array.shape, self.array.dtype.str,
+                self.array.offset)
+
+    def close(self):
+        self.array = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _attach(name):
+    from multiprocessing import resource_tracker, shared_memory
+
+    try:
+        # Python >= 3.13
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Older versions register attached memory at the resource tracker,
+        # too. Only the creating process shall free the memory.
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class _Backend:
+    """
+    Base class of the backends. Use a backend as a context manager, its
+    pool (and memory) is released on exit.
+    """
+
+    def __init__(self, workers, method="svd", chunk_size=DEFAULT_CHUNK_SIZE):
+        self._workers = workers
+        self._method = method
+        self._chunk_size = chunk_size
+        self._pool = None
+
+    def __enter__(self):
+        # The pools are imported on demand, the serial backend (the
+        # default) doesn't need them.
+        executor = getattr(import_module("concurrent.futures"),
+                           self._executor)
+        self._pool = executor(self._workers)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._pool.shutdown()
+
+    def radon_rounds(self, points, n, rounds, rng=None, bounds=None,
+                     cancel=None):
+        """
+        Return the population after the given number of rounds, each
+        replacing the population by n radon points of groups sampled from
+        it, see lib.radon_round (also for the bounds). Every block of a
+        round samples from its own child stream of rng. If the event cancel
+        is set, a CancelledError is raised before the next round.
+        """
+        raise NotImplementedError()
+
+    def radon_tree(self, leaves, rng=None):
+        """
+        Reduce the leaves to a single radon point, see lib.radon_tree. The
+        subtrees are reduced from child streams of rng.
+        """
+        raise NotImplementedError()
+
+    def map_blocks(self, func, *arrays, **kwargs):
+        """
+        Call func(*blocks, **kwargs) for blocks along the first axis of the
+        arrays and concatenate the returned arrays (or tuples of arrays).
+        func must compute every entry independently of its block.
+        """
+        raise NotImplementedError()
+
+    def _ranges(self, n, size=None):
+        # By default the blocks of a round don't depend on the number of
+        # workers, so every block gets the same random stream with any
+        # backend.
+        size = self._chunk_size if size is None else size
+        return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+    def _subtrees(self, L, d):
+        # Use the smallest number of subtrees, that keeps every worker busy.
+        n_subtrees = 1
+        while n_subtrees < self._workers and n_subtrees * (d + 2) <= L:
+            n_subtrees *= d + 2
+        size = ceil(L / n_subtrees)
+        return [(start, min(start + size, L)) for start in range(0, L, size)]
+
+
+class SerialBackend(_Backend):
+    """Run everything in the calling thread."""
+
+    def __init__(self, workers=None, method="svd",
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(1, method, chunk_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def radon_rounds(self, points, n, rounds, rng=None, bounds=None,
+                     cancel=None):
+        T = np.asarray(points)
+        rng = np.random.default_rng(rng)
+        ranges = self._ranges(n)
+
+        for i in range(rounds):
+            check_cancelled(cancel)
+            out = np.empty((n, T.shape[1]))
+            for (start, stop), seed in zip(ranges, spawn(rng, len(ranges))):
+                radon_round(T, stop - start, self._method, self._chunk_size,
+                            out[start:stop], np.random.default_rng(seed),
+                            _block(bounds, start, stop))
+            T = out
+
+        return T
+
+    def radon_tree(self, leaves, rng=None):
+        return radon_tree(leaves, self._method, np.random.default_rng(rng))
+
+    def map_blocks(self, func, *arrays, **kwargs):
+        return func(*arrays, **kwargs)
+
+
+class ProcessBackend(_Backend):
+    """
+    Run the radon rounds and trees in a pool of worker processes. The
+    points live in shared memory, the tasks only consist of their spec and
+    the range of radon points to compute.
+    """
+
+    _executor = "ProcessPoolExecutor"
+
+    def __init__(self, workers, method="svd", chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(workers, method, chunk_size)
+        self._arrays = []
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        for array in self._arrays:
+            array.close()
+        self._arrays = []
+
+    def _shared(self, shape, values=None):
+        array = SharedArray(shape)
+        self._arrays.append(array)
+        if values is not None:
+            array.array[...] = values
+        return array
+
+    def radon_rounds(self, points, n, rounds, rng=None, bounds=None,
+                     cancel=None):
+        """
+        See _Backend.radon_rounds. The blocks are computed by the workers.
+        Memory-mapped points are mapped by the workers, too, instead of
+        being copied into shared memory.
+        """
+        d = np.shape(points)[1]
+        rng = np.random.default_rng(rng)
+
+        source = MappedArray.from_memmap(points)
+        if source is None:
+            _points = np.asarray(points)
+            source = self._shared(_points.shape, _points)
+        target = self._shared((n, d))
+        ranges = self._ranges(n)
+
+        for i in range(rounds):
+            check_cancelled(cancel)
+            seeds = spawn(rng, len(ranges))
+            tasks = [self._pool.submit(_radon_round_task, type(source),
+                                       source.spec, target.spec, start, stop,
+                                       self._method, self._chunk_size, seed,
+                                       _block(bounds, start, stop))
+                     for (start, stop), seed in zip(ranges, seeds)]
+            for task in tasks:
+                task.result()
+
+            if not isinstance(source, SharedArray) or \
+                    source.array.shape != target.array.shape:
+                source = self._shared((n, d))
+            source, target = target, source
+
+        return source.array.copy()
+
+    def radon_tree(self, leaves, rng=None):
+        """
+        See _Backend.radon_tree. The subtrees below the top levels are
+        reduced by the workers.
+        """
+        _leaves = np.asarray(leaves, dtype=float)
+        shared = self._shared(_leaves.shape, _leaves)
+        rng = np.random.default_rng(rng)
+
+        subtrees = self._subtrees(*_leaves.shape)
+        tasks = [self._pool.submit(_radon_tree_task, shared.spec,
+                                   start, stop, self._method, seed)
+                 for (start, stop), seed in zip(subtrees,
+                                                spawn(rng, len(subtrees)))]
+        roots = np.array([task.result() for task in tasks])
+
+        return radon_tree(roots, self._method, rng)
+
+
+class ThreadBackend(_Backend):
+    """
+    Run the radon rounds and trees in a pool of threads. NumPy releases the
+    GIL during its LAPACK calls, so blocks of batched radon computations
+    run in parallel, without start-up costs or copies of the points.
+    """
+
+    _executor = "ThreadPoolExecutor"
+
+    def radon_rounds(self, points, n, rounds, rng=None, bounds=None,
+                     cancel=None):
+        """
+        See _Backend.radon_rounds. The blocks are computed by the threads,
+        writing into a common output array.
+        """
+        T = np.asarray(points)
+        rng = np.random.default_rng(rng)
+        ranges = self._ranges(n)
+
+        for i in range(rounds):
+            check_cancelled(cancel)
+            seeds = spawn(rng, len(ranges))
+            out = np.empty((n, T.shape[1]))
+            tasks = [self._pool.submit(radon_round, T, stop - start,
+                                       self._method, self._chunk_size,
+                                       out[start:stop],
+                                       np.random.default_rng(seed),
+                                       _block(bounds, start, stop))
+                     for (start, stop), seed in zip(ranges, seeds)]
+            for task in tasks:
+                task.result()
+            T = out
+
+        return T
+
+    def radon_tree(self, leaves, rng=None):
+        """
+        See _Backend.radon_tree. The subtrees below the top levels are
+        reduced by the threads.
+        """
+        _leaves = np.asarray(leaves, dtype=float)
+        rng = np.random.default_rng(rng)
+
+        subtrees = self._subtrees(*_leaves.shape)
+        roots = np.array(list(self._pool.map(
+            lambda r, seed: radon_tree(_leaves[r[0]:r[1]], self._method,
+                                       np.random.default_rng(seed)),
+            subtrees, spawn(rng, len(subtrees)))))
+
+        return radon_tree(roots, self._method, rng)
+
+    def map_blocks(self, func, *arrays, **kwargs):
+        """
+        See _Backend.map_blocks. The work is split evenly across the
+        threads, in blocks of at least MIN_BLOCK_SIZE and at most chunk_size
+        entries.
+        """
+        n = len(arrays[0])
+        size = min(self._chunk_size,
+                   max(MIN_BLOCK_SIZE, ceil(n / self._workers)))
+        ranges = self._ranges(n, size)
+        results = list(self._pool.map(
+            lambda r: func(*(a[r[0]:r[1]] for a in arrays), **kwargs),
+            ranges))
+
+        if isinstance(results[0], tuple):
+            return tuple(np.concatenate(r) for r in zip(*results))
+        return np.concatenate(results)
+
+
+BACKENDS = {
+    "serial": SerialBackend,
+    "process": ProcessBackend,
+    "thread": ThreadBackend,
+}
+
+
+def get_backend(workers=None, executor="process", method="svd",
+                chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Return the backend of the executor ("serial", "process" or "thread")
+    with the given number of workers. Without workers, the serial backend is
+    returned.
+    """
+    if executor not in BACKENDS:
+        raise ValueError("Unknown executor: " + str(executor))
+    if not workers:
+        executor = "serial"
+    return BACKENDS[executor](workers, method, chunk_size)
+
+
+def spawn(rng, n):
+    """
+    Return n independent child seeds (numpy.random.SeedSequence) of the
+    generator rng. Workers create their own generators from them.
+    """
+    return np.random.SeedSequence(rng.integers(2 ** 63)).spawn(n)
+
+
+def _block(bounds, start, stop):
+    return None if bounds is None else bounds[start:stop]
+
+
+def _radon_round_task(source_type, source_spec, target_spec, start, stop,
+                      method, chunk_size, seed, bounds):
+    with source_type.attach(source_spec) as source, \
+            SharedArray.attach(target_spec) as target:
+        radon_round(source.array, stop - start, method, chunk_size,
+                    target.array[start:stop], np.random.default_rng(seed),
+                    bounds)
+
+
+def _radon_tree_task(spec, start, stop, method, seed):
+    with SharedArray.attach(spec) as leaves:
+        root = np.array(radon_tree(leaves.array[start:stop], method,
+                                   np.random.default_rng(seed)))
+    return root
@@ -0,0 +1,321 @@
+"""
+Readers of point files. Every reader returns the points as a (n, d)-ndarray
+of floats and raises a ValueError for malformed input.
+
+The readers accept file objects or paths ("-" for stdin). Files compressed
+with gzip, bz2 or xz are decompressed while reading, see open_points.
+"""
+import io
+import os
+import re
+import sys
+from importlib import import_module
+
+import numpy as np
+
+# Number of characters, that are read and parsed at once.
+DEFAULT_READ_SIZE = 2 ** 20
+
+# Compression modules by file extension and by magic bytes. They are only
+# imported to read a compressed file.
+_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma", ".lzma": "lzma"}
+_MAGIC = ((b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "lzma"))
+
+
+def open_points(path, binary=False):
+    """
+    Open a point file for reading, "-" opens stdin. A file compressed with
+    gzip, bz2 or xz is detected by its extension or magic bytes and
+    decompressed as a stream.
+
+    The file is opened only once and the magic bytes are peeked, so named
+    pipes (e.g. of a process substitution) can be read, too.
+
+    :param path: path of the file
+    :param binary: open the file in binary instead of text mode
+    :return: a file object
+    """
+    mode = "rb" if binary else "rt"
+
+    if path == "-":
+        stream = sys.stdin.buffer
+        compression = _detect(stream.peek(6))
+    else:
+        stream = open(path, "rb")
+        compression = _compression(path, stream)
+
+    if compression is None:
+        return stream if binary else io.TextIOWrapper(stream)
+
+    file = import_module(compression).open(stream, mode)
+    if path != "-":
+        _close_with(file, stream)
+    return file
+
+
+def _close_with(file, stream):
+    # The compression modules don't close a file object they were given,
+    # close it together with the file reading from it.
+    close = file.close
+
+    def _close():
+        try:
+            close()
+        finally:
+            stream.close()
+
+    file.close = _close
+
+
+def _compression(path, stream):
+    # Return the name of the compression module of a file opened as a
+    # buffered binary stream, or None.
+    compression = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if compression is None:
+        compression = _detect(stream.peek(6))
+    return compression
+
+
+def _detect(head):
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def read_points_csv(file, delimiter="\t", read_size=DEFAULT_READ_SIZE):
+    """
+    Read the points of a csv file, one point per line. Empty lines (and
+    lines of whitespace only) are skipped.
+
+    The lines are parsed in chunks of about read_size characters by
+    numpy.loadtxt. If a chunk is malformed, its lines are checked one by
+    one to report the line number.
+
+    :param file: a file object opened in text mode or a path
+    :param delimiter: the separator of the coordinates
+    :param read_size: number of characters parsed at once
+    :return: (n, d)-ndarray of floats
+    """
+    if isinstance(file, str):
+        with open_points(file) as _file:
+            return read_points_csv(_file, delimiter, read_size)
+
+    chunks = []
+    d = None
+    line_no = 1
+
+    while True:
+        lines = file.readlines(read_size)
+        if not lines:
+            break
+
+        rows = [line for line in lines if line.strip()]
+        if rows:
+            try:
+                chunk = np.loadtxt(rows, dtype=float, delimiter=delimiter,
+                                   comments=None, quotechar='"', ndmin=2)
+            except ValueError as e:
+                _raise_malformed(lines, delimiter, d, line_no, e)
+
+            if d is not None and chunk.shape[1] != d:
+                _raise_malformed(lines, delimiter, d, line_no)
+            d = chunk.shape[1]
+            chunks.append(chunk)
+
+        line_no += len(lines)
+
+    if not chunks:
+        raise ValueError("No points found.")
+
+    return as_points(np.concatenate(chunks))
+
+
+def _raise_malformed(lines, delimiter, d, line_no, error=None):
+    # Find the first malformed line of a chunk, starting at line_no.
+    for i, line in enumerate(lines, line_no):
+        if not line.strip():
+            continue
+
+        fields = line.rstrip("\r\n").split(delimiter)
+        try:
+            [float(field.strip().strip('"')) for field in fields]
+        except ValueError:
+            raise ValueError("Line {}: invalid number in {!r}".format(
+                i, line.rstrip("\r\n"))) from error
+
+        if d is not None and len(fields) != d:
+            raise ValueError("Line {}: expected {} values, got {}".format(
+                i, d, len(fields))) from error
+        d = len(fields)
+
+    raise ValueError("Lines {} to {}: {}".format(
+        line_no, line_no + len(lines) - 1, error)) from error
+
+
+def read_points_json(file, read_size=DEFAULT_READ_SIZE):
+    """
+    Read the points of a json file, either a list of points or newline
+    delimited json with one point per line.
+
+    The file is parsed in chunks of about read_size characters into a
+    growing array, so about the memory of the points is needed, instead of
+    the nested lists of json.load.
+
+    :param file: a file object opened in text mode or a path
+    :param read_size: number of characters parsed at once
+    :return: (n, d)-ndarray of floats
+    """
+    if isinstance(file, str):
+        with open_points(file) as _file:
+            return read_points_json(_file, read_size)
+
+    # A list of points starts with two opening brackets, ndjson with one.
+    pending = ""
+    while True:
+        chunk = file.read(read_size)
+        pending += chunk
+        head = pending.lstrip()
+        if not chunk or head[1:].strip():
+            break
+
+    nested = head.startswith("[") and head[1:].lstrip().startswith("[")
+    pending = head[1:] if nested else head
+
+    points = np.empty((0, 0))
+    n = 0
+    closed = eof = False
+
+    while not eof:
+        chunk = file.read(read_size)
+        eof = not chunk
+        pending += chunk
+
+        # Parse all complete rows, i.e. up to the last closing bracket.
+        end = pending.rfind("]") + 1
+        text, pending = pending[:end], pending[end:]
+
+        if closed and (text + pending).strip():
+            raise ValueError("Unexpected data after the list of points")
+
+        if nested and text.count("]") > text.count("["):
+            end = _closing_bracket(text)
+            if (text[end + 1:] + pending).strip():
+                raise ValueError("Unexpected data after the list of points")
+            text = text[:end]
+            closed = True
+
+        if text.strip():
+            rows = _parse_json_rows(text, nested, n)
+            if n == 0:
+                points = np.empty((len(rows), rows.shape[1]))
+            elif rows.shape[1] != points.shape[1]:
+                raise ValueError("Rows {} to {}: expected {} values".format(
+                    n + 1, n + len(rows), points.shape[1]))
+
+            if n + len(rows) > len(points):
+                points.resize((max(2 * len(points), n + len(rows)),
+                               points.shape[1]), refcheck=False)
+            points[n:n + len(rows)] = rows
+            n += len(rows)
+
+    if pending.strip() or nested and not closed:
+        raise ValueError("Incomplete json after row {}".format(n))
+    if n == 0:
+        raise ValueError("No points found.")
+
+    points.resize((n, points.shape[1]), refcheck=False)
+    return as_points(points)
+
+
+def _closing_bracket(text):
+    # Return the index of the first "]" of complete rows, that isn't matched
+    # by a "[", i.e. the closing bracket of the list.
+    depth = 0
+    for bracket in re.finditer(r"[][]", text):
+        depth += 1 if bracket.group() == "[" else -1
+        if depth < 0:
+            return bracket.start()
+
+
+# Replaces the brackets, commas and line breaks of json rows of numbers, such
+# that every row becomes a line of whitespace separated numbers.
+_JSON_ROWS = str.maketrans("[],\r\n", " \n   ")
+
+
+def _parse_json_rows(text, nested, n):
+    # Parse the complete rows "[x, y, ...]" of a chunk, that follow the
+    # first n rows. The structure is validated by counting the brackets and
+    # commas.
+    values = text.translate(_JSON_ROWS)
+    if not values.strip():
+        raise ValueError("Rows after {}: empty row".format(n))
+
+    try:
+        rows = np.loadtxt(io.StringIO(values), dtype=float, comments=None,
+                          ndmin=2)
+    except ValueError as e:
+        raise ValueError("Rows after {}: {}".format(n, e)) from e
+
+    n_rows, d = rows.shape
+    commas = n_rows * (d - 1)
+    if nested:
+        # The rows of a list are separated by commas, too.
+        commas += n_rows - 1 if n == 0 else n_rows
+
+    if text.count("[") != n_rows or text.count("]") != n_rows or \
+            text.count(",") != commas:
+        raise ValueError("Rows {} to {}: malformed json".format(
+            n + 1, n + n_rows))
+
+    return rows
+
+
+def read_points_npy(file):
+    """
+    Read the points of a .npy file. An uncompressed file given by its path is
+    memory-mapped instead of loaded, so the algorithms only read the points
+    they sample.
+
+    :param file: a path, or a binary file object, which is read completely
+    :return: (n, d)-ndarray of floats, or a numpy.memmap of numbers
+    """
+    if isinstance(file, str):
+        if os.path.isfile(file):
+            # Only regular files can be mapped.
+            with open(file, "rb") as _file:
+                compression = _compression(file, _file)
+            if compression is None:
+                return as_points(np.load(file, mmap_mode="r"))
+
+        with open_points(file, binary=True) as _file:
+            return read_points_npy(_file)
+
+    # np.load needs a seekable file, stdin isn't.
+    points = np.load(io.BytesIO(file.read()))
+
+    return as_points(points)
+
+
+def as_points(points):
+    """
+    Return the points as a (n, d)-ndarray of floats. Raise a ValueError if
+    they are empty, differ in dimension or contain no numbers. Float arrays
+    are returned without a copy. Memory maps of numbers keep their dtype,
+    the algorithms cast only the points they sample (see lib.sample_chunks)
+    instead of copying the whole file into memory.
+    """
+    try:
+        _points = np.asanyarray(points)
+    except ValueError:
+        raise ValueError("Invalid dimension for some point.")
+
+    if _points.ndim != 2 or _points.size == 0:
+        raise ValueError("Invalid dimension for some point.")
+
+    if _points.dtype.kind not in "iuf":
+        raise ValueError("Invalid format for some point.")
+
+    if isinstance(_points, np.memmap):
+        return _points
+    return _points.astype(float, copy=False)
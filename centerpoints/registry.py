@@ -0,0 +1,37 @@
+"""
+The registry of the centerpoint algorithms. An algorithm module is only
+imported when the algorithm is used for the first time.
+"""
+from importlib import import_module
+
+# The algorithms by name and the location of their class.
+ALGORITHMS = {
+    "radon": ("centerpoints.iterated_radon", "IteratedRadon"),
+    "tverberg": ("centerpoints.iterated_tverberg", "IteratedTverberg"),
+}
+
+
+def get_algorithm(name, **options):
+    """
+    Return a new instance of the algorithm name, see ALGORITHMS. The options
+    are keyword arguments of its constructor.
+    """
+    if name not in ALGORITHMS:
+        raise ValueError("Unknown algorithm: " + str(name))
+
+    module, cls = ALGORITHMS[name]
+    return getattr(import_module(module), cls)(**options)
+
+
+def centerpoint(points, algorithm="radon", **options):
+    """
+    Return the centerpoint of the points (or an approximation of it),
+    computed by the algorithm (see ALGORITHMS) initialized with the options,
+    e.g. method, the null space method of the radon partitions.
+
+    Examples
+    --------
+    >>> centerpoint(points, "radon", use_tree=True, rng=0)
+    >>> centerpoint(points, "tverberg", method="lu")
+    """
+    return get_algorithm(algorithm, **options).centerpoint(points)
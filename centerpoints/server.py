@@ -0,0 +1,317 @@
+"""
+A local centerpoint server, started by "python -m centerpoints serve". It
+speaks HTTP on a localhost port or on a Unix socket:
+
+    POST /centerpoint   a json request like the ones of service.handle, the
+                        response is {"id": ..., "result": [x, y, ...]}
+    GET /stats          the counters of Stats
+
+Concurrent requests of the same algorithm, options and dimension are
+batched by a Batcher and computed at once by centerpoint_segments, e.g.
+by the batched radon rounds of IteratedRadon.
+"""
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .helpers import NumpyAwareJSONEncoder
+from .readers import as_points
+from .registry import ALGORITHMS, get_algorithm
+
+
+class Stats:
+    """Latency and throughput counters of a server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.points = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record_request(self, latency, n_points, error=False):
+        with self._lock:
+            self.requests += 1
+            self.errors += error
+            self.points += n_points
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def record_batch(self, size):
+        with self._lock:
+            self.batches += 1
+            self.batched_requests += size
+
+    def as_dict(self):
+        with self._lock:
+            uptime = time.perf_counter() - self._started
+            return {
+                "uptime": uptime,
+                "requests": self.requests,
+                "errors": self.errors,
+                "points": self.points,
+                "batches": self.batches,
+                "mean_batch_size": self.batched_requests / max(1,
+                                                               self.batches),
+                "mean_latency": self.latency_total / max(1, self.requests),
+                "max_latency": self.latency_max,
+                "requests_per_second": self.requests / uptime,
+                "points_per_second": self.points / uptime,
+            }
+
+
+class Batcher:
+    """
+    Collect the requests submitted within max_delay seconds (up to
+    max_batch) and compute those of the same algorithm, options and
+    dimension as one batch. The batches are computed by a pool of warm
+    worker processes, or without workers one after the other by the
+    dispatching thread, while the next batch is collected.
+    """
+
+    def __init__(self, workers=None, max_batch=64, max_delay=0.005,
+                 stats=None):
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._stats = Stats() if stats is None else stats
+        self._queue = queue.Queue()
+
+        self._pool = None
+        if workers:
+            self._pool = ProcessPoolExecutor(workers, initializer=_warm_up)
+            # Start the workers now, not with the first request.
+            for future in [self._pool.submit(_warm_up)
+                           for i in range(workers)]:
+                future.result()
+
+        self._dispatcher = threading.Thread(target=self._dispatch,
+                                            daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, points, algorithm="radon", options=None):
+        """
+        Return a future of the centerpoint of the (n, d)-array points, see
+        registry.get_algorithm for the algorithm and options.
+        """
+        options = {} if options is None else options
+        key = (algorithm, json.dumps(options, sort_keys=True),
+               points.shape[1])
+        future = Future()
+        self._queue.put((key, points, future))
+        return future
+
+    def close(self):
+        """Compute the pending requests and stop the workers."""
+        self._queue.put(None)
+        self._dispatcher.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def _dispatch(self):
+        closed = False
+        while not closed:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            items = [item]
+            deadline = time.monotonic() + self._max_delay
+            while len(items) < self._max_batch:
+                try:
+                    item = self._queue.get(
+                        timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                items.append(item)
+
+            groups = {}
+            for key, points, future in items:
+                groups.setdefault(key, []).append((points, future))
+
+            for (algorithm, options, d), group in groups.items():
+                self._stats.record_batch(len(group))
+                self._run(algorithm, json.loads(options),
+                          [points for points, _ in group],
+                          [future for _, future in group])
+
+    def _run(self, algorithm, options, point_sets, futures):
+        if self._pool is None:
+            _resolve(futures, compute_batch(algorithm, options, point_sets))
+            return
+
+        batch = self._pool.submit(compute_batch, algorithm, options,
+                                  point_sets)
+        batch.add_done_callback(lambda batch: _resolve_batch(futures, batch))
+
+
+def compute_batch(algorithm, options, point_sets):
+    """
+    Return the centerpoints of the point sets as a list of (error, result)
+    pairs, where error is None or a message, see
+    CenterpointAlgo.centerpoint_each.
+    """
+    try:
+        algo = get_algorithm(algorithm, **options)
+    except Exception as e:
+        return [(_message(e), None)] * len(point_sets)
+
+    return [(None if error is None else _message(error), result)
+            for error, result in algo.centerpoint_each(point_sets)]
+
+
+def _message(error):
+    return "{}: {}".format(type(error).__name__, error)
+
+
+def _resolve(futures, results):
+    for future, (error, result) in zip(futures, results):
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(ValueError(error))
+
+
+def _resolve_batch(futures, batch):
+    # Resolve the futures of the requests by the future of their batch.
+    if batch.exception() is not None:
+        for future in futures:
+            future.set_exception(batch.exception())
+    else:
+        _resolve(futures, batch.result())
+
+
+def _warm_up():
+    # Import the algorithm modules of a worker before the first request.
+    for name in ALGORITHMS:
+        get_algorithm(name)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/stats":
+            self._respond(404, {"error": "Not found: " + self.path})
+            return
+        self._respond(200, self.server.stats.as_dict())
+
+    def do_POST(self):
+        if self.path != "/centerpoint":
+            self._respond(404, {"error": "Not found: " + self.path})
+            return
+
+        t0 = time.perf_counter()
+        response = {}
+        n_points = 0
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode())
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a json object")
+            if "id" in request:
+                response["id"] = request["id"]
+
+            points = as_points(request["points"])
+            n_points = len(points)
+            future = self.server.batcher.submit(
+                points, request.get("algorithm", "radon"),
+                request.get("options", {}))
+            response["result"] = future.result()
+            status = 200
+        except Exception as e:
+            response["error"] = "{}: {}".format(type(e).__name__, e)
+            status = 400
+
+        self.server.stats.record_request(time.perf_counter() - t0,
+                                         n_points, status != 200)
+        self._respond(status, response)
+
+    def _respond(self, status, body):
+        data = json.dumps(body, cls=NumpyAwareJSONEncoder).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep quiet, the counters are available at /stats.
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(address, workers=None, max_batch=64, max_delay=0.005):
+    """
+    Return a server listening on address, either a (host, port) tuple or
+    the path of a Unix socket. Run it with serve_forever(), stop it with
+    shutdown() and server_close(), which also stops its batcher.
+    """
+    if isinstance(address, str):
+        server = _UnixHTTPServer(address, _Handler)
+    else:
+        server = ThreadingHTTPServer(address, _Handler)
+        server.daemon_threads = True
+
+    server.stats = Stats()
+    server.batcher = Batcher(workers, max_batch, max_delay, server.stats)
+
+    server_close = server.server_close
+
+    def close():
+        server_close()
+        server.batcher.close()
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+
+    server.server_close = close
+    return server
+
+
+def main(argv):
+    """Parse the arguments of "python -m centerpoints serve" and serve."""
+    parser = argparse.ArgumentParser(
+        prog="python -m centerpoints serve",
+        description="Serve centerpoints over HTTP on localhost or a Unix "
+                    "socket. POST a json request to /centerpoint, GET the "
+                    "counters from /stats.")
+
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Listen on this host (default: %(default)s).")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="Listen on this port (default: %(default)s).")
+    parser.add_argument("--unix", metavar="PATH",
+                        help="Listen on a Unix socket instead of a port.")
+    parser.add_argument("--workers", type=int, default=None, metavar="NUM",
+                        help="Compute the batches in NUM worker processes.")
+    parser.add_argument("--max-batch", type=int, default=64, metavar="NUM",
+                        help="Batch up to NUM requests (default: "
+                             "%(default)s).")
+    parser.add_argument("--max-delay", type=float, default=5, metavar="MS",
+                        help="Wait up to MS milliseconds for requests to "
+                             "batch (default: %(default)s).")
+
+    args = parser.parse_args(argv)
+
+    address = args.unix if args.unix else (args.host, args.port)
+    server = make_server(address, args.workers, args.max_batch,
+                         args.max_delay / 1000)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
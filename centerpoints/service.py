@@ -0,0 +1,109 @@
+"""
+A worker, that reads newline delimited json requests and writes one json
+response per request in the same order, see serve.
+
+A request is an object like
+
+    {"id": 1, "points": [[1.0, 2.0], ...], "algorithm": "radon",
+     "options": {"use_tree": true}}
+
+where "id" is optional and passed through, "algorithm" is one of
+registry.ALGORITHMS (default: the default algorithm of serve) and "options"
+are keyword arguments of the algorithm's constructor, they override the
+default options of serve for its default algorithm. The response is
+
+    {"id": 1, "result": [x, y]}  or  {"id": 1, "error": "message"}
+"""
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .helpers import NumpyAwareJSONEncoder
+from .readers import as_points
+from .registry import get_algorithm
+
+
+def serve(input, output, workers=None, algorithm="radon", options=None):
+    """
+    Answer the requests read line by line from input. With workers, up to
+    that many requests are computed concurrently by a pool of threads, but
+    the responses are still written in the order of the requests. If
+    writing a response fails (e.g. with a BrokenPipeError), no more
+    requests are read and the error is raised.
+
+    :param input: a text file object
+    :param output: a text file object, flushed after every response
+    :param workers: number of concurrent requests
+    :param algorithm: the algorithm of requests without one
+    :param options: the default options of that algorithm
+    """
+    requests = (line for line in input if line.strip())
+
+    if not workers:
+        for line in requests:
+            _write(output, handle(line, algorithm, options))
+        return
+
+    # The writer waits for the responses in order, while new requests are
+    # read and submitted. The queue bounds the number of pending requests.
+    pending = queue.Queue(2 * workers)
+    errors = []
+    writer = threading.Thread(target=_write_responses,
+                              args=(pending, output, errors))
+    writer.start()
+
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            for line in requests:
+                if errors:
+                    break
+                pending.put(pool.submit(handle, line, algorithm, options))
+    finally:
+        pending.put(None)
+        writer.join()
+
+    if errors:
+        raise errors[0]
+
+
+def handle(line, algorithm="radon", options=None):
+    """Return the response (as a dict) to a request (a json string)."""
+    response = {}
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("A request must be a json object")
+        if "id" in request:
+            response["id"] = request["id"]
+
+        name = request.get("algorithm", algorithm)
+        _options = dict(options or {}) if name == algorithm else {}
+        _options.update(request.get("options", {}))
+        algo = get_algorithm(name, **_options)
+        points = as_points(request["points"])
+        response["result"] = algo.centerpoint(points)
+    except Exception as e:
+        response["error"] = "{}: {}".format(type(e).__name__, e)
+
+    return response
+
+
+def _write_responses(pending, output, errors):
+    # After an error, the queue is still emptied, so the reading thread
+    # doesn't block on it.
+    while True:
+        future = pending.get()
+        if future is None:
+            break
+        if errors:
+            continue
+        try:
+            _write(output, future.result())
+        except Exception as e:
+            errors.append(e)
+
+
+def _write(output, response):
+    output.write(json.dumps(response, cls=NumpyAwareJSONEncoder) + "\n")
+    output.flush()
@@ -0,0 +1,312 @@
+"""
+Estimators of the centerpoint of a stream of points, that doesn't fit into
+memory: StreamingRadon of all points so far and SlidingWindowRadon of the
+latest points.
+"""
+from math import ceil
+
+import numpy as np
+
+from .lib import DEFAULT_CHUNK_SIZE, radon_points, radon_tree, \
+    sample_indices
+
+# Number of points, the leaves are shuffled with.
+DEFAULT_BUFFER_SIZE = 4096
+# Number of points of a block of a sliding window
+DEFAULT_BLOCK_SIZE = 512
+
+
+class StreamingRadon:
+    """
+    Approximate the centerpoint of a stream by a radon tree like
+    IteratedRadon(use_tree=True), that is merged as the points arrive:
+    every d + 2 nodes of a level are replaced by their radon point one level
+    up, like the digits of a counter in base d + 2. Every level keeps less
+    than d + 2 nodes, so besides the shuffle buffer the memory is
+    O((d + 2) * height), where the height is about log(n) / log(d + 2).
+
+    Consecutive points of a stream are often alike (e.g. sorted or
+    clustered), so they aren't grouped in their order: every point enters a
+    buffer of buffer_size points and replaces a random one, that becomes a
+    leaf of the tree.
+
+        >>> estimator = StreamingRadon()
+        >>> for chunk in chunks:
+        ...     estimator.update(chunk)
+        >>> estimator.result()
+    """
+
+    def __init__(self, method="svd", buffer_size=DEFAULT_BUFFER_SIZE,
+                 chunk_size=DEFAULT_CHUNK_SIZE, rng=None):
+        """
+        :param method: the null space method, see lib.solve_homogeneous
+        :param buffer_size: number of points the leaves are shuffled with
+        :param chunk_size: number of groups, whose radon points are solved
+                           at once
+        :param rng: a numpy.random.Generator or seed
+        """
+        self._method = method
+        self._buffer_size = buffer_size
+        self._chunk_size = chunk_size
+        self._rng = np.random.default_rng(rng)
+        self._buffer = None
+        self._levels = []
+        self.n = 0
+
+    def update(self, chunk):
+        """Add a chunk of points, a (m, d)-array_like."""
+        _chunk = np.asarray(chunk, dtype=float)
+        if _chunk.ndim != 2 or self._buffer is not None and \
+                _chunk.shape[1] != self._buffer.shape[1]:
+            raise ValueError("Invalid dimension for some point.")
+
+        if self._buffer is None:
+            self._buffer = np.empty((0, _chunk.shape[1]))
+
+        leaves = self._shuffle(_chunk)
+        self._levels = push(self._levels, leaves, self._method,
+                            self._chunk_size)
+        self.n += len(_chunk)
+
+    def result(self):
+        """
+        Return the centerpoint approximation of all points so far, i.e. the
+        root of their tree, see root. The stream may be continued afterwards.
+        """
+        if not self.n:
+            raise ValueError("No points found.")
+
+        levels = push(self._levels, self._rng.permutation(self._buffer),
+                      self._method, self._chunk_size)
+        return root(levels)
+
+    def _shuffle(self, chunk):
+        # Put the chunk into the buffer and return the points leaving it.
+        free = self._buffer_size - len(self._buffer)
+        if free > 0:
+            self._buffer = np.concatenate((self._buffer, chunk[:free]))
+            chunk = chunk[free:]
+
+        if len(chunk) < len(self._buffer):
+            slots = self._rng.choice(len(self._buffer), len(chunk),
+                                     replace=False)
+            leaves = self._buffer[slots]
+            self._buffer[slots] = chunk
+            return leaves
+
+        # Large chunks are shuffled together with the buffer.
+        pool = np.concatenate((self._buffer, chunk))
+        self._rng.shuffle(pool)
+        self._buffer = pool[:len(self._buffer)].copy()
+        return pool[len(self._buffer):]
+
+
+class SlidingWindowRadon:
+    """
+    Approximate the centerpoint of the latest window points of a stream.
+
+    The stream is split into blocks of block_size points. Every block is
+    summarized by the roots of d + 2 radon trees, whose leaves are sampled
+    from it. Every d + 2 consecutive summaries (aligned like the digits of a
+    counter in base d + 2) are merged into the summary of a segment one
+    level up: its j-th node is the radon point of the j-th nodes of its
+    parts. So every block adds one level 0 summary and on average less than
+    one merge.
+
+    The window of the latest ceil(window / block_size) blocks consists of
+    O((d + 2) * log(window / block_size)) such segments. A refresh combines
+    only those like the root of StreamingRadon, so its cost doesn't grow
+    with the window. Summaries of expired blocks are dropped.
+
+    The estimate covers the complete blocks, it is refreshed whenever a
+    block is completed.
+
+        >>> estimator = SlidingWindowRadon(10000)
+        >>> for chunk in chunks:
+        ...     estimator.update(chunk)
+        ...     estimator.result()
+    """
+
+    def __init__(self, window, block_size=DEFAULT_BLOCK_SIZE, method="svd",
+                 rng=None):
+        """
+        :param window: number of the latest points to estimate
+        :param block_size: number of points of a block
+        :param method: the null space method, see lib.solve_homogeneous
+        :param rng: a numpy.random.Generator or seed
+        """
+        self._block_size = block_size
+        self._window = ceil(window / block_size)
+        self._method = method
+        self._rng = np.random.default_rng(rng)
+        self._pending = None
+        # The summaries of every level by the index of their first block
+        self._segments = []
+        self._count = 0
+        self._result = None
+
+    def update(self, chunk):
+        """Add a chunk of points, a (m, d)-array_like."""
+        _chunk = np.asarray(chunk, dtype=float)
+        if _chunk.ndim != 2 or self._pending is not None and \
+                _chunk.shape[1] != self._pending.shape[1]:
+            raise ValueError("Invalid dimension for some point.")
+
+        if self._pending is None:
+            self._pending = np.empty((0, _chunk.shape[1]))
+
+        points = np.concatenate((self._pending, _chunk))
+        n_blocks = len(points) // self._block_size
+        stop = n_blocks * self._block_size
+        self._pending = points[stop:].copy()
+        if not n_blocks:
+            return
+
+        # Blocks, that would expire right away, aren't summarized.
+        skip = max(0, n_blocks - self._window)
+        self._count += skip
+        for summary in self._summarize(points[skip * self._block_size:stop]):
+            self._add(summary)
+        self._expire()
+        self._result = None
+
+    def result(self):
+        """
+        Return the centerpoint approximation of the points of the window.
+        """
+        if not self._count:
+            raise ValueError("No complete block of points found.")
+
+        if self._result is None:
+            self._result = root(self._window_levels())
+        return self._result
+
+    def _summarize(self, points):
+        # Return the summaries of consecutive blocks, a (k, d + 2, d)-array.
+        # The d + 2 trees of all blocks are reduced at once.
+        d = points.shape[1]
+        B = self._block_size
+        n_blocks = len(points) // B
+        L = _tree_size(ceil(B / (d + 2)), d)
+
+        ids = sample_indices(B, (d + 2) * L, n_blocks, self._rng)
+        ids += np.arange(n_blocks)[:, None] * B
+        leaves = points[ids].reshape((n_blocks, d + 2, L, d))
+        return radon_tree(leaves, self._method, self._rng)
+
+    def _add(self, summary):
+        # Add the summary of the next block and merge the completed
+        # segments.
+        group = len(summary)
+        start = self._count
+        self._count += 1
+
+        level = 0
+        while True:
+            if level == len(self._segments):
+                self._segments.append({})
+            self._segments[level][start] = summary
+
+            size = group ** level
+            start = self._count - group * size
+            if start % (group * size):
+                break
+            try:
+                parts = [self._segments[level][start + i * size]
+                         for i in range(group)]
+            except KeyError:
+                # Some part expired already.
+                break
+            summary = radon_points(np.stack(parts, axis=1), self._method)
+            level += 1
+
+    def _expire(self):
+        first = self._count - self._window
+        for segments in self._segments:
+            while segments and next(iter(segments)) < first:
+                del segments[next(iter(segments))]
+
+    def _window_levels(self):
+        # Return the nodes of the largest segments, that make up the window,
+        # as levels, see root.
+        group = len(next(iter(self._segments[0].values())))
+        d = group - 2
+        levels = [[] for segments in self._segments]
+
+        start = max(0, self._count - self._window)
+        while start < self._count:
+            for level in reversed(range(len(self._segments))):
+                size = group ** level
+                if start % size == 0 and start + size <= self._count and \
+                        start in self._segments[level]:
+                    break
+            levels[level].append(self._segments[level][start])
+            start += size
+
+        return [np.concatenate(nodes) if nodes else np.empty((0, d))
+                for nodes in levels]
+
+
+def _tree_size(n, d):
+    # Return the smallest power of d + 2, that is at least n, the number of
+    # leaves of a complete radon tree.
+    size = d + 2
+    while size < n:
+        size *= d + 2
+    return size
+
+
+def push(levels, nodes, method="svd", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Add nodes to the lowest level of a tree and carry every d + 2 nodes of a
+    level as their radon point to the next one.
+
+    :param levels: list of (k, d)-ndarrays with k < d + 2, the nodes of the
+                   levels from the leaves upwards
+    :param nodes: (m, d)-array_like
+    :param method: the null space method, see lib.solve_homogeneous
+    :param chunk_size: number of groups, whose radon points are solved at
+                       once
+    :return: the new list of levels
+    """
+    levels = list(levels)
+    nodes = np.asarray(nodes, dtype=float)
+    group = nodes.shape[1] + 2
+
+    l = 0
+    while len(nodes):
+        if l == len(levels):
+            levels.append(nodes[:0])
+        nodes = np.concatenate((levels[l], nodes))
+        full = len(nodes) // group * group
+        levels[l] = nodes[full:].copy()
+        nodes = _radon_groups(nodes[:full], method, chunk_size)
+        l += 1
+
+    return levels
+
+
+def root(levels):
+    """
+    Return the root of a tree, whose levels are incomplete, see push.
+
+    The radon point of a level with less than d + 2 nodes (filled up with
+    repeated nodes like in lib.radon_tree) would just be one of its nodes,
+    so the nodes of all levels are averaged instead, each weighted by its
+    number of leaves.
+    """
+    group = levels[0].shape[1] + 2
+    weights = np.concatenate([np.full(len(level), float(group) ** l)
+                              for l, level in enumerate(levels)])
+    return np.average(np.concatenate(levels), axis=0, weights=weights)
+
+
+def _radon_groups(nodes, method, chunk_size):
+    # Return the radon points of the consecutive groups of d + 2 nodes.
+    d = nodes.shape[1]
+    groups = nodes.reshape((-1, d + 2, d))
+    if len(groups) <= chunk_size:
+        return radon_points(groups, method)
+    return np.concatenate([radon_points(groups[start:start + chunk_size],
+                                        method)
+                           for start in range(0, len(groups), chunk_size)])
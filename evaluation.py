@@ -20,11 +20,13 @@ from centerpoints.iterated_radon import IteratedRadon
 from centerpoints.iterated_tverberg import IteratedTverberg
 
 
-# Initialize the algorithms
+# Initialize the algorithms with a random generator or seed
 algorithms = (
-    (IteratedTverberg(), "IteratedTverberg"),
-    (IteratedRadon(), "IteratedRadon"),
-    (IteratedRadon(True), "IteratedRadon (w/ Trees)")
+    (lambda rng: IteratedTverberg(rng=rng), "IteratedTverberg"),
+    (lambda rng: IteratedTverberg(proof=False, rng=rng),
+     "IteratedTverberg (w/o proofs)"),
+    (lambda rng: IteratedRadon(rng=rng), "IteratedRadon"),
+    (lambda rng: IteratedRadon(True, rng=rng), "IteratedRadon (w/ Trees)")
 )
 
 
@@ -330,9 +332,10 @@ def run_benchmarks(benchmarks, output_dir, seed):
         for i, algorithm in enumerate(algorithms):
             print("Run " + title + " with " + algorithm[1])
 
-            # TODO: Reset seed again????
+            # Every algorithm gets its own generator of the same seed.
+            algo = algorithm[0](seed)
             try:
-                timings, results = benchmark(algorithm[0], points, repeat)
+                timings, results = benchmark(algo, points, repeat)
             except Exception as e:
                 print("Error on calculating centerpoint:", e)
                 import traceback
@@ -386,7 +389,7 @@ def run_benchmarks(benchmarks, output_dir, seed):
             }
 
             # Store the results as csv and json
-            algoname = type(algorithm[0]).__name__ + "-" + str(i)
+            algoname = type(algo).__name__ + "-" + str(i)
             basename = path.join(output_dir, name + "-" + algoname)
             # with open(baseFileName + ".csv", mode="w") as f:
             # writer = csv.writer(f)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from centerpoints.benchmark import benchmark
+from centerpoints.helpers import normal_distributed_points
+from centerpoints.iterated_radon import IteratedRadon
+from centerpoints.iterated_tverberg import IteratedTverberg
+
+
+# Initialize the algorithms with the given number of workers, executor and
+# random generator or seed.
+algorithms = {
+    "radon": lambda w, e, r: IteratedRadon(workers=w, executor=e, rng=r),
+    "radon-tree": lambda w, e, r: IteratedRadon(True, workers=w,
+                                                executor=e, rng=r),
+    "tverberg": lambda w, e, r: IteratedTverberg(workers=w, rng=r),
+}
+
+
+def IntListType(argstr):
+    return list(map(int, argstr.split(",")))
+
+
+def StrListType(argstr):
+    return argstr.split(",")
+
+
+def run_scaling(names, executors, sizes, dimensions, workers, repeat, seed):
+    writer = csv.writer(sys.stdout)
+    writer.writerow(("Algorithm", "Executor", "Size", "Dimension", "Workers",
+                     "min time", "mean time", "speedup"))
+
+    for size in sizes:
+        for dim in dimensions:
+            np.random.seed(seed)
+            points = normal_distributed_points(size, dim)
+
+            for name in names:
+                # The speedup is relative to the serial run.
+                timings, _ = benchmark(algorithms[name](None, "serial", seed),
+                                       points, repeat)
+                serial = min(timings)
+                writer.writerow((name, "serial", size, dim, 0, serial,
+                                 np.mean(timings), 1.0))
+
+                for executor in executors:
+                    # IteratedTverberg only supports threads.
+                    if name == "tverberg" and executor != "thread":
+                        continue
+
+                    for w in workers:
+                        algorithm = algorithms[name](w, executor, seed)
+                        timings, _ = benchmark(algorithm, points, repeat)
+                        writer.writerow((name, executor, size, dim, w,
+                                         min(timings), np.mean(timings),
+                                         serial / min(timings)))
+                        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Measure how the algorithms scale with the number of "
+                    "workers of the process and thread executors, compared "
+                    "to a serial run.")
+
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Repeat each measurement REPEAT times.")
+    parser.add_argument("--sizes", type=IntListType, default=[1000000],
+                        help="Number of normal distributed points.")
+    parser.add_argument("--dimensions", type=IntListType, default=[3],
+                        help="Dimensions of the points.")
+    parser.add_argument("--workers", type=IntListType, default=[1, 2, 4],
+                        help="Numbers of workers.")
+    parser.add_argument("--executors", type=StrListType,
+                        default=["process", "thread"],
+                        help="Executors of the workers.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Generate random points based on this seed.")
+    parser.add_argument("algorithms", nargs="*", default=["radon"],
+                        help="Algorithms to measure. Possible values: " +
+                             ", ".join(algorithms.keys()))
+
+    args = parser.parse_args()
+
+    run_scaling(args.algorithms, args.executors, args.sizes,
+                args.dimensions, args.workers, args.repeat, args.seed)
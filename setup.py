@@ -3,8 +3,6 @@ from setuptools import setup
 with open('README.rst') as readme_file:
     long_description = readme_file.read()
 
-REQUIREMENTS = [i.strip() for i in open("requirements.txt").readlines()]
-
 setup(
     name='centerpoints',
     version='0.1.0',
@@ -14,7 +12,9 @@ setup(
     url='https://github.com/fu-berlin-swp-2014/center-points',
     packages=['centerpoints'],
     license='MIT',
-    install_requires=REQUIREMENTS,
+    python_requires='>=3.8',
+    install_requires=['numpy>=1.23'],
+    extras_require={'gui': ['PySide', 'PyOpenGL']},
     long_description=long_description,
     entry_points={
         'console_scripts': [
@@ -3,7 +3,7 @@
 CONDA_PACKETS='numpy|scipy|matplotlib|ipython|ipython-notebook|Pygments|Sphinx|docutils|pandas'
 CONDA_DEPS=$(grep -E $CONDA_PACKETS  requirements.txt | sed 's/==/=/')
 PIP_DEPS=$(grep -vE $CONDA_PACKETS requirements.txt )
-TRAVIS_PYTHON_VERSION=3.4
+TRAVIS_PYTHON_VERSION=3.8
 
 if [ ! -d "$HOME/miniconda3/envs/centerpoints/" ];then
     echo $CONDA_DEPS
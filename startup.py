@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from centerpoints.helpers import normal_distributed_points
+
+
+# The commands to measure, run in a new interpreter each. {points} is
+# replaced by a csv file of points.
+commands = {
+    "python": ["-c", "pass"],
+    "import": ["-c", "import centerpoints"],
+    "help": ["-m", "centerpoints", "--help"],
+    "radon": ["-m", "centerpoints", "-1", "{points}"],
+    "tverberg": ["-m", "centerpoints", "-2", "{points}"],
+    "serve": ["-m", "centerpoints", "--serve-stdio"],
+}
+
+
+def run_startup(names, size, dim, repeat, seed):
+    writer = csv.writer(sys.stdout)
+    writer.writerow(("Command", "Size", "Dimension", "min time",
+                     "mean time"))
+
+    np.random.seed(seed)
+    points = normal_distributed_points(size, dim)
+    # The serve command answers a single request.
+    request = json.dumps({"points": points.tolist()}) + "\n"
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "points.csv")
+        np.savetxt(filename, points, delimiter="\t")
+
+        for name in names:
+            argv = [sys.executable] + [arg.format(points=filename)
+                                       for arg in commands[name]]
+            timings = []
+            for i in range(repeat):
+                t0 = time.perf_counter()
+                subprocess.run(argv, input=request.encode(), check=True,
+                               stdout=subprocess.DEVNULL)
+                timings.append(time.perf_counter() - t0)
+
+            writer.writerow((name, size, dim, min(timings),
+                             np.mean(timings)))
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Measure the cold-start time of the package and the "
+                    "CLI, each command runs in a new interpreter.")
+
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Repeat each measurement REPEAT times.")
+    parser.add_argument("--size", type=int, default=1000,
+                        help="Number of normal distributed points.")
+    parser.add_argument("--dimension", type=int, default=3,
+                        help="Dimension of the points.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Generate random points based on this seed.")
+    parser.add_argument("commands", nargs="*", default=list(commands),
+                        help="Commands to measure. Possible values: " +
+                             ", ".join(commands.keys()))
+
+    args = parser.parse_args()
+
+    run_startup(args.commands, args.size, args.dimension, args.repeat,
+                args.seed)
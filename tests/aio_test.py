@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+import numpy as np
+
+from centerpoints import aio
+from centerpoints.iterated_radon import IteratedRadon
+from centerpoints.iterated_tverberg import IteratedTverberg
+
+
+class CountingRadon(IteratedRadon):
+    """Count the calls of the computing methods."""
+    calls = []
+
+    def centerpoint(self, points, cancel=None):
+        self.calls.append("centerpoint")
+        return super().centerpoint(points, cancel)
+
+    def centerpoint_segments(self, points, starts, stops, cancel=None):
+        self.calls.append("centerpoint_segments")
+        return super().centerpoint_segments(points, starts, stops, cancel)
+
+
+class TestAsync(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.point_sets = [rng.normal(size=(500, 2)) + i for i in range(8)]
+        CountingRadon.calls = []
+
+    def assertCenterpoint(self, points, center):
+        self.assertEqual(center.shape, (points.shape[1], ))
+        self.assertTrue(np.all(center >= points.min(axis=0)))
+        self.assertTrue(np.all(center <= points.max(axis=0)))
+
+    def test_centerpoint_async(self):
+        points = self.point_sets[0]
+        for algorithm in (IteratedRadon(rng=0), IteratedTverberg()):
+            center = asyncio.run(algorithm.centerpoint_async(points))
+            self.assertCenterpoint(points, center)
+
+    def test_coalesce(self):
+        # Concurrent calls are computed as one batch.
+        algorithm = CountingRadon(rng=0)
+
+        async def run():
+            return await asyncio.gather(*(algorithm.centerpoint_async(points)
+                                          for points in self.point_sets))
+
+        centers = asyncio.run(run())
+        self.assertEqual(CountingRadon.calls, ["centerpoint_segments"])
+        for points, center in zip(self.point_sets, centers):
+            self.assertCenterpoint(points, center)
+
+    def test_coalesce_release(self):
+        # Idle coalescers don't keep their algorithms alive.
+        async def run():
+            await asyncio.gather(*(IteratedRadon(rng=i).centerpoint_async(
+                points) for i, points in enumerate(self.point_sets)))
+            await asyncio.sleep(0.01)
+            return len(aio._coalescers[asyncio.get_running_loop()])
+
+        self.assertEqual(asyncio.run(run()), 0)
+
+    def test_coalesce_invalid(self):
+        # Only the invalid call of a batch fails.
+        algorithm = IteratedRadon(rng=0)
+        point_sets = self.point_sets[:2] + [self.point_sets[2][:3]]
+
+        async def run():
+            return await asyncio.gather(*(algorithm.centerpoint_async(points)
+                                          for points in point_sets),
+                                        return_exceptions=True)
+
+        centers = asyncio.run(run())
+        self.assertCenterpoint(point_sets[0], centers[0])
+        self.assertCenterpoint(point_sets[1], centers[1])
+        self.assertIsInstance(centers[2], AssertionError)
+
+    def test_process_executor(self):
+        algorithm = IteratedRadon(rng=0)
+        points = np.random.default_rng(1).normal(size=(20000, 3))
+
+        async def run():
+            with ProcessPoolExecutor(1) as executor:
+                return await algorithm.centerpoint_async(points, executor)
+
+        self.assertCenterpoint(points, asyncio.run(run()))
+
+    def test_cancel(self):
+        points = np.random.default_rng(1).normal(size=(20000, 3))
+        cancel = threading.Event()
+        cancel.set()
+        for algorithm in (IteratedRadon(), IteratedRadon(True),
+                          IteratedTverberg()):
+            with self.assertRaises(CancelledError):
+                algorithm.centerpoint(points, cancel)
+
+    def test_cancel_async(self):
+        algorithm = IteratedRadon(rng=0)
+        points = np.random.default_rng(1).normal(size=(200000, 3))
+
+        async def run():
+            task = asyncio.ensure_future(algorithm.centerpoint_async(points))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await task
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(run())
@@ -1,5 +1,6 @@
+import os
 import unittest
-from tempfile import NamedTemporaryFile
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 
 from centerpoints.cli import parse_arguments
 
@@ -36,3 +37,37 @@ class TestArgumentParser(unittest.TestCase):
         options = parse_arguments(["-1", self.ptsf.name])
         self.assertEqual(options.format, "csv", )
         self.assertEqual(options.separator, "\t")
+
+        options = parse_arguments(["-1", "--npy", self.ptsf.name])
+        self.assertEqual(options.format, "npy")
+
+        args = ["-1", "--npy", "--json", self.ptsf.name]
+        self.assertRaises(SystemExit, parse_arguments, args)
+
+    def test_serve_stdio(self):
+        options = parse_arguments(["--serve-stdio", "--workers", "4"])
+        self.assertTrue(options.serve_stdio)
+        self.assertEqual(options.workers, 4)
+
+        # Without the worker mode an algorithm and the points are required.
+        self.assertRaises(SystemExit, parse_arguments, [self.ptsf.name])
+        self.assertRaises(SystemExit, parse_arguments, ["-1"])
+        self.assertRaises(SystemExit, parse_arguments,
+                          ["-1", "--workers", "4", self.ptsf.name])
+
+        options = parse_arguments(["--serve-stdio", "--radon-tree"])
+        self.assertTrue(options.radon_tree)
+        self.assertRaises(SystemExit, parse_arguments,
+                          ["--serve-stdio", "-3"])
+
+    def test_missing_file(self):
+        self.assertRaises(SystemExit, parse_arguments,
+                          ["-1", self.ptsf.name + ".missing"])
+
+    def test_named_pipe(self):
+        # e.g. a process substitution like <(cat points.csv)
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "pipe")
+            os.mkfifo(filename)
+            args = parse_arguments(["-1", filename])
+            self.assertEqual(args.points, filename)
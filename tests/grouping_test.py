@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from centerpoints import centerpoint_by_group
+from centerpoints.iterated_radon import IteratedRadon
+from centerpoints.iterated_tverberg import IteratedTverberg
+
+
+class TestGrouping(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.labels = rng.choice(["a", "b", "c"], 3000)
+        self.offsets = {"a": 0, "b": 10, "c": -10}
+        self.points = rng.normal(size=(3000, 3))
+        self.points += [[self.offsets[l]] for l in self.labels]
+
+    def assertCenterpoints(self, labels, centers):
+        self.assertEqual(list(labels), ["a", "b", "c"])
+        self.assertEqual(centers.shape, (3, 3))
+        for label, center in zip(labels, centers):
+            group = self.points[self.labels == label]
+            self.assertTrue(np.all(center >= group.min(axis=0)))
+            self.assertTrue(np.all(center <= group.max(axis=0)))
+
+    def test_centerpoint_by_group(self):
+        self.assertCenterpoints(*centerpoint_by_group(self.points,
+                                                      self.labels))
+
+        algorithm = IteratedRadon(True, rng=0)
+        self.assertCenterpoints(*centerpoint_by_group(self.points,
+                                                      self.labels, algorithm))
+
+    def test_centerpoint_by_group_fallback(self):
+        # Other algorithms compute the centerpoint of every group on its own.
+        self.assertCenterpoints(*centerpoint_by_group(self.points,
+                                                      self.labels,
+                                                      IteratedTverberg()))
+
+    def test_invalid_labels(self):
+        self.assertRaises(ValueError, centerpoint_by_group, self.points,
+                          self.labels[:10])
@@ -0,0 +1,72 @@
+import json
+import subprocess
+import sys
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+import centerpoints
+
+# Modules, that must never be imported by the core or the CLI.
+GUI_MODULES = ("PySide", "OpenGL", "centerpoints.visualise")
+
+
+def imported_modules(code):
+    """Return the modules imported after running code in a new process."""
+    code += "\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))"
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output.decode().splitlines()[-1])
+
+
+class TestImports(unittest.TestCase):
+    def assertNotImported(self, modules, names):
+        for module in modules:
+            self.assertFalse(module.startswith(names), module)
+
+    def test_import_package(self):
+        modules = imported_modules("import centerpoints")
+        self.assertNotImported(modules, GUI_MODULES + (
+            "numpy", "centerpoints.iterated_radon",
+            "centerpoints.iterated_tverberg"))
+
+    def test_cli(self):
+        with TemporaryDirectory() as directory:
+            filename = path.join(directory, "points.csv")
+            np.savetxt(filename, np.random.normal(size=(100, 2)),
+                       delimiter="\t")
+
+            code = ("import sys\nfrom centerpoints.cli import main\n"
+                    "sys.argv = ['centerpoints', '-2', {!r}]\n"
+                    "main()".format(filename))
+            modules = imported_modules(code)
+
+        self.assertNotImported(modules, GUI_MODULES + (
+            "centerpoints.iterated_radon", "centerpoints.benchmark",
+            "concurrent.futures.process", "multiprocessing.shared_memory"))
+        self.assertIn("centerpoints.iterated_tverberg", modules)
+
+    def test_centerpoint(self):
+        points = np.random.normal(size=(500, 3))
+
+        for algorithm in centerpoints.ALGORITHMS:
+            cpt = centerpoints.centerpoint(points, algorithm)
+            self.assertEqual(cpt.shape, (3, ))
+
+            # The null space method is an option of the algorithms.
+            cpt = centerpoints.centerpoint(points, algorithm, method="lu")
+            self.assertEqual(cpt.shape, (3, ))
+
+        cpt = centerpoints.centerpoint(points, "radon", use_tree=True, rng=0)
+        np.testing.assert_array_equal(
+            cpt, centerpoints.get_algorithm("radon", use_tree=True,
+                                            rng=0).centerpoint(points))
+        cpt = centerpoints.centerpoint(points, algorithm="radon",
+                                       method="qr", rng=0)
+        np.testing.assert_array_equal(
+            cpt, centerpoints.get_algorithm("radon", method="qr",
+                                            rng=0).centerpoint(points))
+
+        self.assertRaises(ValueError, centerpoints.centerpoint, points,
+                          "unknown")
@@ -59,6 +59,93 @@ class TestLibrary(unittest.TestCase):
                                    radon / np.sum(smaller_alphas),
                                    atol=1e-15)
 
+    def test_radon_partitions(self):
+        for d in [1, 2, 3, 5, 10]:
+            groups = np.random.normal(size=(50, d + 2, d))
+            radon_pts, alphas, masks = lib.radon_partitions(groups)
+
+            self.assertEqual(radon_pts.shape, (50, d))
+            self.assertEqual(alphas.shape, (50, d + 2))
+            self.assertEqual(masks.shape, (50, d + 2))
+
+            for group, radon_pt, a, mask in zip(groups, radon_pts,
+                                                alphas, masks):
+                _radon_pt, (alpha_I, alpha_J), (mask_I, mask_J) = \
+                    lib.radon_partition(group)
+
+                nptest.assert_allclose(radon_pt, _radon_pt, atol=1e-10)
+
+                # the sign of the solution, and thus I and J, may differ
+                if mask[0] != mask_I[0]:
+                    mask_I, alpha_I, alpha_J = mask_J, alpha_J, alpha_I
+                nptest.assert_array_equal(mask, mask_I)
+                nptest.assert_allclose(a[mask], alpha_I)
+                nptest.assert_allclose(a[~mask], alpha_J)
+
+                # both partitions describe the radon point
+                nptest.assert_allclose(np.dot(a[~mask], group[~mask]),
+                                       radon_pt, atol=1e-10)
+
+    def test_radon_points(self):
+        groups = np.random.normal(size=(20, 5, 3))
+        nptest.assert_allclose(lib.radon_points(groups),
+                               [lib.radon_point(g) for g in groups],
+                               atol=1e-10)
+
+    def test_radon_tree(self):
+        for d in [1, 2, 3, 5]:
+            # a perfect power of d + 2 is a complete tree
+            leaves = np.random.normal(size=((d + 2) ** 3, d))
+            root = lib.radon_tree(leaves)
+
+            level = lib.radon_points(leaves.reshape(-1, d + 2, d))
+            level = lib.radon_points(level.reshape(-1, d + 2, d))
+            level = lib.radon_points(level.reshape(-1, d + 2, d))
+            nptest.assert_allclose(root, level[0], atol=1e-10)
+
+            # incomplete levels are filled up
+            for n in [1, d + 1, d + 3, 7 * (d + 2) + 1]:
+                root = lib.radon_tree(np.random.normal(size=(n, d)))
+                self.assertEqual(root.shape, (d, ))
+
+    def test_radon_tree_stacked(self):
+        leaves = np.random.normal(size=(4, 64, 2))
+
+        roots = lib.radon_tree(leaves)
+        self.assertEqual(roots.shape, (4, 2))
+        for root, tree_leaves in zip(roots, leaves):
+            nptest.assert_allclose(root, lib.radon_tree(tree_leaves))
+
+    def test_sample_bounded_indices(self):
+        bounds = np.array([[0, 3], [10, 12], [5, 6]])
+        ids = lib.sample_bounded_indices(bounds, 50, np.random.default_rng(0))
+
+        self.assertEqual(ids.shape, (3, 50))
+        self.assertTrue(np.all(ids >= bounds[:, :1]))
+        self.assertTrue(np.all(ids < bounds[:, 1:]))
+
+    def test_sample_chunks(self):
+        population = np.arange(30).reshape((10, 3))
+        chunks = [chunk.copy() for chunk
+                  in lib.sample_chunks(population, 5, 23, chunk_size=10)]
+
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 3])
+        for chunk in chunks:
+            self.assertEqual(chunk.shape[1:], (5, 3))
+            self.assertEqual(chunk.dtype, np.float64)
+            # every sampled point is a point of the population
+            self.assertTrue(np.all(chunk[:, :, 0] % 3 == 0))
+            self.assertTrue(np.all(chunk[:, :, 1] == chunk[:, :, 0] + 1))
+            self.assertTrue(np.all(chunk[:, :, 2] == chunk[:, :, 0] + 2))
+
+    def test_sample_indices_rng(self):
+        for rng in [np.random.default_rng, np.random.RandomState]:
+            ids = lib.sample_indices(10, 5, 7, rng(3))
+            self.assertEqual(ids.shape, (7, 5))
+            self.assertTrue(np.all((0 <= ids) & (ids < 10)))
+            nptest.assert_array_equal(ids,
+                                      lib.sample_indices(10, 5, 7, rng(3)))
+
     def test_solve_homogeneous(self):
         M = np.array([[1, 0, 0, 0, 2],
                       [0, 0, 3, 0, 0],
@@ -68,6 +155,42 @@ class TestLibrary(unittest.TestCase):
         null = lib.solve_homogeneous(M)
         nptest.assert_allclose(np.dot(M, null), np.zeros(4), atol=1e-10)
 
+    def test_solve_homogeneous_methods(self):
+        M = np.random.normal(size=(100, 4, 5))
+
+        # The matrix of test_solve_homogeneous is rank-deficient.
+        M[0] = np.array([[1, 0, 0, 0, 2],
+                         [0, 0, 3, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 4, 0, 0, 0]])
+
+        # Singular leading (4, 4)-system, but a regular matrix.
+        I = np.eye(4)
+        M[1] = np.hstack((I[:, :3], I[:, :1], I[:, 3:]))
+
+        for method in lib.NULL_SPACE_METHODS:
+            nulls = lib.solve_homogeneous(M, method)
+            self.assertEqual(nulls.shape, (100, 5))
+            nptest.assert_allclose(np.linalg.norm(nulls, axis=1), 1)
+            nptest.assert_allclose(np.einsum("mrc,mc->mr", M, nulls),
+                                   np.zeros((100, 4)), atol=1e-10)
+
+            null = lib.solve_homogeneous(M[1], method)
+            nptest.assert_allclose(np.dot(M[1], null), np.zeros(4),
+                                   atol=1e-10)
+
+        self.assertRaises(ValueError, lib.solve_homogeneous, M, "cholesky")
+
+    def test_radon_partitions_methods(self):
+        groups = np.random.normal(size=(50, 7, 5))
+        radon_pts = lib.radon_points(groups)
+
+        for method in lib.NULL_SPACE_METHODS:
+            nptest.assert_allclose(lib.radon_points(groups, method),
+                                   radon_pts, atol=1e-8)
+            nptest.assert_allclose(lib.radon_point(groups[0], method),
+                                   radon_pts[0], atol=1e-8)
+
     def test_null_space(self):
         # simple example with a one dimensional null space ()
         a = np.array([[2, 3, 5], [-4, 2, 3], [0, 0, 0]])
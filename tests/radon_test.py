@@ -1,5 +1,7 @@
 import unittest
 import math
+from os import path
+from tempfile import TemporaryDirectory
 
 import numpy as np
 
@@ -25,6 +27,130 @@ class TestLibrary(unittest.TestCase):
         #     if not abs(p[0]**2 + p[1]**2 + p[2]**2 - 1) <= 1e-10:
         #         pass
 
+    def test_radon_methods(self):
+        points = uniform_sphere_points(100, 3)
+
+        for method in ["svd", "qr", "lu"]:
+            cpt = IteratedRadon(method=method).centerpoint(points)
+            cpt2 = IteratedRadon(True, method).centerpoint(points)
+            self.assertEqual(cpt.shape, (3, ))
+            self.assertEqual(cpt2.shape, (3, ))
+
+    def test_radon_workers(self):
+        points = uniform_sphere_points(2000, 3)
+
+        cpt = IteratedRadon(workers=2, chunk_size=100).centerpoint(points)
+        cpt2 = IteratedRadon(True, workers=2).centerpoint(points)
+        self.assertEqual(cpt.shape, (3, ))
+        self.assertEqual(cpt2.shape, (3, ))
+
+        # Seeded runs are reproducible.
+        cpt = IteratedRadon(workers=2, chunk_size=100,
+                            rng=42).centerpoint(points)
+        cpt2 = IteratedRadon(workers=2, chunk_size=100,
+                             rng=42).centerpoint(points)
+        np.testing.assert_array_equal(cpt, cpt2)
+
+    def test_radon_threads(self):
+        points = uniform_sphere_points(2000, 3)
+
+        for use_tree in [False, True]:
+            algorithm = IteratedRadon(use_tree, workers=2, executor="thread",
+                                      chunk_size=100)
+            cpt = algorithm.centerpoint(points)
+            self.assertEqual(cpt.shape, (3, ))
+
+        algorithm = IteratedRadon(workers=2, executor="fibers")
+        self.assertRaises(ValueError, algorithm.centerpoint, points)
+
+    def test_radon_rng(self):
+        points = uniform_sphere_points(2000, 3)
+
+        for use_tree in [False, True]:
+            # Every executor and number of workers computes the same result
+            # for the same seed.
+            cpt = IteratedRadon(use_tree, chunk_size=100,
+                                rng=7).centerpoint(points)
+            for executor, workers in [("thread", 1), ("thread", 3),
+                                      ("process", 2)]:
+                algorithm = IteratedRadon(use_tree, chunk_size=100,
+                                          workers=workers, executor=executor,
+                                          rng=np.random.default_rng(7))
+                np.testing.assert_array_equal(cpt,
+                                              algorithm.centerpoint(points))
+
+        # The instances don't depend on the global random state.
+        np.random.seed(1)
+        cpt = IteratedRadon(rng=3).centerpoint(points)
+        np.random.seed(2)
+        cpt2 = IteratedRadon(rng=3).centerpoint(points)
+        np.testing.assert_array_equal(cpt, cpt2)
+
+    def test_radon_many(self):
+        point_sets = np.random.normal(size=(5, 200, 3))
+        point_sets[1] += 10
+
+        for use_tree in [False, True]:
+            algorithm = IteratedRadon(use_tree, chunk_size=100, rng=0)
+            cpts = algorithm.centerpoint_many(point_sets)
+            self.assertEqual(cpts.shape, (5, 3))
+            # Every centerpoint lies within the bounding box of its set.
+            self.assertTrue(np.all(cpts >= point_sets.min(axis=1)))
+            self.assertTrue(np.all(cpts <= point_sets.max(axis=1)))
+
+        # The workers compute the same as the serial run.
+        algorithm = IteratedRadon(chunk_size=100, rng=0)
+        cpts = algorithm.centerpoint_many(point_sets)
+        cpts2 = IteratedRadon(chunk_size=100, workers=2, executor="thread",
+                              rng=0).centerpoint_many(point_sets)
+        np.testing.assert_array_equal(cpts, cpts2)
+
+        # Sets of different sizes are computed as segments.
+        cpts = IteratedRadon(rng=0).centerpoint_many([point_sets[0],
+                                                      point_sets[1][:150]])
+        self.assertEqual(cpts.shape, (2, 3))
+        cpts2 = IteratedRadon(rng=0).centerpoint_segments(
+            point_sets[:2].reshape((400, 3)), [0, 200], [200, 350])
+        np.testing.assert_array_equal(cpts, cpts2)
+
+    def test_radon_each(self):
+        # Only the invalid set of a batch fails.
+        point_sets = [np.random.normal(size=(200, 3)),
+                      np.random.normal(size=(3, 3))]
+        (error, cpt), (error2, cpt2) = \
+            IteratedRadon(rng=0).centerpoint_each(point_sets)
+        self.assertIsNone(error)
+        self.assertEqual(cpt.shape, (3, ))
+        self.assertIsInstance(error2, AssertionError)
+        self.assertIsNone(cpt2)
+
+    def test_radon_segments(self):
+        # Segments in any order, with gaps and overlaps, given as lists
+        points = np.random.normal(size=(1000, 3))
+        points[:500] += 100
+        starts, stops = [600, 0, 100], [800, 200, 400]
+
+        for use_tree in [False, True]:
+            algorithm = IteratedRadon(use_tree, rng=0)
+            cpts = algorithm.centerpoint_segments(points, starts, stops)
+            self.assertEqual(cpts.shape, (3, 3))
+            for cpt, start, stop in zip(cpts, starts, stops):
+                self.assertTrue(np.all(cpt >= points[start:stop].min(axis=0)))
+                self.assertTrue(np.all(cpt <= points[start:stop].max(axis=0)))
+
+    def test_radon_memmap(self):
+        with TemporaryDirectory() as directory:
+            filename = path.join(directory, "points.npy")
+            np.save(filename, uniform_sphere_points(2000, 3))
+            points = np.load(filename, mmap_mode="r")
+
+            # The workers map the file themselves.
+            cpt = IteratedRadon(chunk_size=100, rng=0).centerpoint(points)
+            cpt2 = IteratedRadon(chunk_size=100, workers=2,
+                                 rng=0).centerpoint(points)
+            np.testing.assert_array_equal(cpt, cpt2)
+            del points
+
     def test_radon_1d(self):
         points = np.arange(100)
         points.shape = (100, 1)
@@ -0,0 +1,163 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import threading
+import unittest
+from tempfile import TemporaryDirectory
+from os import path
+
+import numpy as np
+import numpy.testing as nptest
+
+from centerpoints.helpers import uniform_sphere_points
+from centerpoints.iterated_radon import IteratedRadon
+from centerpoints.iterated_tverberg import IteratedTverberg
+from centerpoints.readers import open_points, read_points_csv, \
+    read_points_json, read_points_npy
+
+
+class TestReaders(unittest.TestCase):
+    def test_read_points_csv(self):
+        points = read_points_csv(io.StringIO("1\t2\n3.5\t-4\n\n5\t6e1\n"))
+        self.assertEqual(points.dtype, np.float64)
+        nptest.assert_array_equal(points, [[1, 2], [3.5, -4], [5, 60]])
+
+        points = read_points_csv(io.StringIO("1,2,3\n4,5,6\n"), ",")
+        nptest.assert_array_equal(points, [[1, 2, 3], [4, 5, 6]])
+
+    def test_read_points_csv_chunks(self):
+        points = np.arange(3000, dtype=float).reshape((1000, 3))
+        text = "".join("{},{},{}\n".format(*point) for point in points)
+
+        nptest.assert_array_equal(
+            read_points_csv(io.StringIO(text), ",", read_size=100), points)
+
+    def test_read_points_csv_malformed(self):
+        with self.assertRaisesRegex(ValueError, "Line 3"):
+            read_points_csv(io.StringIO("1,2\n3,4\n5,x\n"), ",")
+
+        with self.assertRaisesRegex(ValueError, "Line 2"):
+            read_points_csv(io.StringIO("1,2\n3\n5,6\n"), ",")
+
+        # Lines of whitespace only are skipped like empty ones.
+        nptest.assert_array_equal(
+            read_points_csv(io.StringIO("1,2\n  \n3,4\n"), ","),
+            [[1, 2], [3, 4]])
+        with self.assertRaisesRegex(ValueError, "Line 3"):
+            read_points_csv(io.StringIO("1,2\n \t \n5,x\n"), ",")
+
+        # The malformed line is in another chunk than the first point.
+        text = "1,2\n" * 1000 + "1,2,3\n"
+        with self.assertRaisesRegex(ValueError, "Line 1001"):
+            read_points_csv(io.StringIO(text), ",", read_size=100)
+
+        self.assertRaises(ValueError, read_points_csv, io.StringIO(""))
+
+    def test_read_points_json(self):
+        points = read_points_json(io.StringIO("[[1, 2], [3.5, 4]]"))
+        self.assertEqual(points.dtype, np.float64)
+        nptest.assert_array_equal(points, [[1, 2], [3.5, 4]])
+
+        for text in ["[[1, 2], [3]]", '[["1", "2"]]', "[]",
+                     "[[1, 2],, [3, 4]]", "[[1, 2] [3, 4]]",
+                     "[[1, 2], [3, 4]", "[[1, [2]]]", "[[1, 2]] [[3, 4]]",
+                     "[1, 2]\n[]\n", "[[1, 2]],[3, 4]",
+                     "[[1, 2], [3, 4]]\n,[5, 6]", "[[1, 2]]]"]:
+            self.assertRaises(ValueError, read_points_json,
+                              io.StringIO(text))
+
+    def test_read_points_json_chunks(self):
+        points = np.arange(3000, dtype=float).reshape((1000, 3))
+
+        text = json.dumps(points.tolist(), indent=1)
+        for read_size in [1, 100, 10 ** 6]:
+            nptest.assert_array_equal(
+                read_points_json(io.StringIO(text), read_size), points)
+
+        # newline delimited json
+        text = "".join(json.dumps(point) + "\n" for point in points.tolist())
+        nptest.assert_array_equal(
+            read_points_json(io.StringIO(text), read_size=100), points)
+
+    def test_read_points_npy(self):
+        with TemporaryDirectory() as directory:
+            filename = path.join(directory, "points.npy")
+            np.save(filename, np.arange(12.0).reshape((4, 3)))
+
+            points = read_points_npy(filename)
+            self.assertIsInstance(points, np.memmap)
+            nptest.assert_array_equal(points, np.arange(12).reshape((4, 3)))
+
+            with open(filename, "rb") as file:
+                points = read_points_npy(file)
+            nptest.assert_array_equal(points, np.arange(12).reshape((4, 3)))
+
+            np.save(filename, np.arange(12.0))
+            self.assertRaises(ValueError, read_points_npy, filename)
+
+    def test_read_points_npy_float32(self):
+        # Memory maps of other numbers aren't copied into floats.
+        with TemporaryDirectory() as directory:
+            filename = path.join(directory, "points.npy")
+            points = uniform_sphere_points(2000, 3)
+            np.save(filename, points.astype(np.float32))
+
+            points = read_points_npy(filename)
+            self.assertIsInstance(points, np.memmap)
+            self.assertEqual(points.dtype, np.float32)
+
+            for algorithm in [IteratedRadon(rng=0), IteratedRadon(True),
+                              IteratedRadon(workers=2, rng=0),
+                              IteratedTverberg()]:
+                cpt = algorithm.centerpoint(points)
+                self.assertEqual(cpt.dtype, float)
+                self.assertTrue(np.all(np.abs(cpt) <= 1 + 1e-6))
+            del points
+
+    def test_compressed(self):
+        points = np.arange(12.0).reshape((4, 3))
+        text = "".join("{},{},{}\n".format(*point) for point in points)
+
+        with TemporaryDirectory() as directory:
+            for compression, extension in [(gzip, ".gz"), (bz2, ".bz2"),
+                                           (lzma, ".xz")]:
+                # Detected by the extension and by the magic bytes
+                for filename in ["points" + extension, "points"]:
+                    filename = path.join(directory, filename)
+                    with compression.open(filename, "wt") as file:
+                        file.write(text)
+
+                    with open_points(filename) as file:
+                        self.assertEqual(file.read(), text)
+                    nptest.assert_array_equal(
+                        read_points_csv(filename, ","), points)
+
+            # A named pipe is read only once.
+            for data in [text.encode(), gzip.compress(text.encode())]:
+                filename = path.join(directory, "pipe")
+                os.mkfifo(filename)
+                writer = threading.Thread(target=_write_pipe,
+                                          args=(filename, data))
+                writer.start()
+                nptest.assert_array_equal(
+                    read_points_csv(filename, ","), points)
+                writer.join()
+                os.unlink(filename)
+
+            filename = path.join(directory, "points.json.gz")
+            with gzip.open(filename, "wt") as file:
+                json.dump(points.tolist(), file)
+            nptest.assert_array_equal(read_points_json(filename), points)
+
+            filename = path.join(directory, "points.npy.xz")
+            with lzma.open(filename, "wb") as file:
+                np.save(file, points)
+            nptest.assert_array_equal(read_points_npy(filename), points)
+
+
+def _write_pipe(filename, data):
+    with open(filename, "wb") as pipe:
+        pipe.write(data)
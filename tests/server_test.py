@@ -0,0 +1,109 @@
+import http.client
+import json
+import socket
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from centerpoints.server import Batcher, make_server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path):
+        super().__init__("localhost")
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self._socket_path)
+
+
+class TestServer(unittest.TestCase):
+    def start(self, address, **kwargs):
+        server = make_server(address, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.addCleanup(stop)
+        return server
+
+    def request(self, connect, method, url, body=None):
+        connection = connect()
+        try:
+            connection.request(method, url,
+                               body=None if body is None else json.dumps(body))
+            response = connection.getresponse()
+            return response.status, json.loads(response.read().decode())
+        finally:
+            connection.close()
+
+    def test_http(self):
+        server = self.start(("127.0.0.1", 0), max_delay=0.05)
+        port = server.server_address[1]
+
+        def connect():
+            return http.client.HTTPConnection("127.0.0.1", port)
+
+        point_sets = np.random.normal(size=(8, 200, 3))
+        requests = [{"id": i, "points": points.tolist(), "options": {"rng": 0}}
+                    for i, points in enumerate(point_sets)]
+
+        # Concurrent requests are batched.
+        with ThreadPoolExecutor(8) as pool:
+            responses = list(pool.map(
+                lambda r: self.request(connect, "POST", "/centerpoint", r),
+                requests))
+
+        for i, (status, response) in enumerate(responses):
+            self.assertEqual(status, 200)
+            self.assertEqual(response["id"], i)
+            self.assertEqual(len(response["result"]), 3)
+
+        status, response = self.request(connect, "POST", "/centerpoint",
+                                        {"points": [[1, 2], [3]]})
+        self.assertEqual(status, 400)
+        self.assertIn("error", response)
+
+        status, stats = self.request(connect, "GET", "/stats")
+        self.assertEqual(status, 200)
+        self.assertEqual(stats["requests"], 9)
+        self.assertEqual(stats["errors"], 1)
+        self.assertLess(stats["batches"], 8)
+        self.assertGreater(stats["mean_latency"], 0)
+
+        self.assertEqual(self.request(connect, "GET", "/unknown")[0], 404)
+
+    def test_unix_socket(self):
+        with TemporaryDirectory() as directory:
+            socket_path = path.join(directory, "centerpoints.sock")
+            self.start(socket_path)
+
+            status, response = self.request(
+                lambda: UnixHTTPConnection(socket_path), "POST",
+                "/centerpoint", {"points": np.random.normal(
+                    size=(100, 2)).tolist(), "algorithm": "tverberg"})
+            self.assertEqual(status, 200)
+            self.assertEqual(len(response["result"]), 2)
+
+    def test_batcher(self):
+        batcher = Batcher(workers=1, max_delay=0.05)
+        try:
+            point_sets = np.random.normal(size=(4, 200, 3))
+            # The second set is too small, only its request fails.
+            futures = [batcher.submit(points) for points in
+                       [point_sets[0], point_sets[1][:5], point_sets[2]]]
+
+            self.assertEqual(futures[0].result().shape, (3, ))
+            self.assertRaises(ValueError, futures[1].result)
+            self.assertEqual(futures[2].result().shape, (3, ))
+        finally:
+            batcher.close()
@@ -0,0 +1,87 @@
+import io
+import json
+import threading
+import unittest
+
+import numpy as np
+
+from centerpoints.iterated_radon import IteratedRadon
+from centerpoints.service import handle, serve
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.requests = [
+            json.dumps({"id": i, "points": rng.normal(size=(200, 3)).tolist(),
+                        "algorithm": ["radon", "tverberg"][i % 2],
+                        "options": {"rng": i} if i % 2 == 0 else {}})
+            for i in range(10)]
+
+    def serve(self, lines, workers=None):
+        output = io.StringIO()
+        serve(io.StringIO("\n".join(lines) + "\n"), output, workers)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_serve(self):
+        responses = self.serve(self.requests)
+        self.assertEqual([r["id"] for r in responses], list(range(10)))
+        for response in responses:
+            self.assertEqual(len(response["result"]), 3)
+
+        # Concurrent requests are answered in the same order.
+        self.assertEqual(self.serve(self.requests, workers=3), responses)
+
+    def test_errors(self):
+        responses = self.serve(['{"id": 1, "points": [[1, 2], [3]]}',
+                                "no json", "",
+                                '{"algorithm": "unknown", "points": [[1]]}',
+                                '{"points": [[1, 2]], "options": {"x": 1}}',
+                                self.requests[0]])
+
+        self.assertEqual(len(responses), 5)
+        self.assertEqual(responses[0]["id"], 1)
+        for response in responses[:4]:
+            self.assertIn("error", response)
+        self.assertIn("result", responses[4])
+
+    def test_broken_output(self):
+        # A failing output stops reading the requests, it doesn't block.
+        errors = []
+
+        def run():
+            try:
+                serve(io.StringIO("\n".join(self.requests * 10)),
+                      BrokenOutput(), workers=2)
+            except BrokenPipeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(60)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_handle(self):
+        response = handle(self.requests[1])
+        self.assertEqual(response["id"], 1)
+        self.assertEqual(response["result"].shape, (3, ))
+
+    def test_default_options(self):
+        # The default options only apply to the default algorithm.
+        points = np.random.default_rng(1).normal(size=(200, 3))
+        request = json.dumps({"points": points.tolist()})
+        response = handle(request, "radon", {"use_tree": True, "rng": 0})
+        np.testing.assert_array_equal(
+            response["result"],
+            IteratedRadon(True, rng=0).centerpoint(points))
+
+        request = json.dumps({"points": points.tolist(),
+                              "algorithm": "tverberg"})
+        response = handle(request, "radon", {"use_tree": True})
+        self.assertIn("result", response)
+
+
+class BrokenOutput(io.StringIO):
+    def write(self, text):
+        raise BrokenPipeError()
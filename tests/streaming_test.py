@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+
+from centerpoints import SlidingWindowRadon, StreamingRadon
+from centerpoints.iterated_radon import IteratedRadon
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.points = rng.normal(size=(100000, 3))
+
+    def stream(self, points, chunk_size, **options):
+        estimator = StreamingRadon(rng=0, **options)
+        for start in range(0, len(points), chunk_size):
+            estimator.update(points[start:start + chunk_size])
+        return estimator
+
+    def test_streaming(self):
+        for chunk_size in (1, 1000, 100000):
+            estimator = self.stream(self.points[:20000], chunk_size)
+            self.assertEqual(estimator.n, 20000)
+            self.assertTrue(np.all(np.abs(estimator.result()) < 0.2))
+            # Every level keeps less than d + 2 nodes.
+            for level in estimator._levels:
+                self.assertLess(len(level), 5)
+
+    def test_sorted(self):
+        # The leaves are shuffled, a sorted stream gives the same estimate.
+        points = self.points[np.argsort(self.points[:, 0])]
+        estimator = self.stream(points, 1000)
+        self.assertTrue(np.all(np.abs(estimator.result()) < 0.2))
+
+    def test_result_continue(self):
+        estimator = self.stream(self.points[:50000], 1000)
+        estimator.result()
+        estimator.update(self.points[50000:])
+        self.assertEqual(estimator.n, 100000)
+        self.assertTrue(np.all(np.abs(estimator.result()) < 0.2))
+
+    def test_rng(self):
+        np.testing.assert_array_equal(self.stream(self.points, 999).result(),
+                                      self.stream(self.points, 999).result())
+
+    def test_compare_radon(self):
+        # A skewed distribution, whose centerpoint differs from the mean.
+        points = np.random.default_rng(1).lognormal(size=(100000, 2))
+        expected = IteratedRadon(rng=0).centerpoint(points)
+        np.testing.assert_allclose(self.stream(points, 1000).result(),
+                                   expected, atol=0.2)
+
+    def test_invalid(self):
+        estimator = StreamingRadon()
+        with self.assertRaises(ValueError):
+            estimator.result()
+        estimator.update(self.points[:10])
+        with self.assertRaises(ValueError):
+            estimator.update(np.zeros((10, 2)))
+        with self.assertRaises(ValueError):
+            estimator.update(np.zeros(3))
+
+
+class TestSlidingWindow(unittest.TestCase):
+    def setUp(self):
+        # A stream, whose center moves from 0 to 10
+        rng = np.random.default_rng(0)
+        self.points = rng.normal(size=(200000, 3))
+        self.points += np.linspace(0, 10, len(self.points))[:, None]
+
+    def test_sliding_window(self):
+        estimator = SlidingWindowRadon(20000, 500, rng=0)
+        for start in range(0, len(self.points), 1000):
+            estimator.update(self.points[start:start + 1000])
+
+        expected = np.median(self.points[-20000:], axis=0)
+        np.testing.assert_allclose(estimator.result(), expected, atol=0.2)
+
+    def test_window_segments(self):
+        # The segments of the window cover its blocks exactly once.
+        estimator = SlidingWindowRadon(50 * 100, 100, rng=0)
+        for count in range(1, 400):
+            estimator.update(self.points[(count - 1) * 100:count * 100])
+            levels = estimator._window_levels()
+            blocks = sum(len(nodes) * 5 ** l / 5
+                         for l, nodes in enumerate(levels))
+            self.assertEqual(blocks, min(count, 50))
+
+    def test_result_cached(self):
+        estimator = SlidingWindowRadon(10000, 500, rng=0)
+        estimator.update(self.points[:10000])
+        result = estimator.result()
+        self.assertIs(estimator.result(), result)
+        estimator.update(self.points[10000:10499])
+        self.assertIs(estimator.result(), result)
+        estimator.update(self.points[10499:10500])
+        self.assertIsNot(estimator.result(), result)
+
+    def test_invalid(self):
+        estimator = SlidingWindowRadon(10000, 500)
+        estimator.update(self.points[:499])
+        with self.assertRaises(ValueError):
+            estimator.result()
+        with self.assertRaises(ValueError):
+            estimator.update(np.zeros((10, 2)))
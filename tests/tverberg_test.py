@@ -4,8 +4,12 @@ import math
 
 import numpy as np
 
-from centerpoints.iterated_tverberg import IteratedTverberg
+import numpy.testing as nptest
+
+from centerpoints.iterated_tverberg import IteratedTverberg, _Buckets, \
+    _prune
 from centerpoints.helpers import uniform_sphere_points
+from centerpoints.parallel import get_backend
 
 
 class TestLibrary(unittest.TestCase):
@@ -27,6 +31,135 @@ class TestLibrary(unittest.TestCase):
         #     if not abs(p[0]**2 + p[1]**2 + p[2]**2 - 1) <= 1e-10:
         #         pass
 
+    def test_tverberg_methods(self):
+        points = uniform_sphere_points(1000, 3)
+
+        for method in ["svd", "qr", "lu"]:
+            cpt = IteratedTverberg(method=method).centerpoint(points)
+            self.assertEqual(cpt.shape, (3, ))
+
+    def test_tverberg_without_proof(self):
+        points = uniform_sphere_points(1000, 3)
+
+        cpt = IteratedTverberg(proof=False).centerpoint(points)
+        self.assertEqual(cpt.shape, (3, ))
+
+        points = np.arange(2000)
+        points.shape = (2000, 1)
+        cpt = IteratedTverberg(proof=False).centerpoint(points)
+        self.assertEqual(cpt.shape, (1, ))
+
+    def test_tverberg_workers(self):
+        points = uniform_sphere_points(10000, 3)
+
+        # Blocks of 64 groups split every bucket level.
+        cpt = IteratedTverberg().centerpoint(points)
+        cpt2 = IteratedTverberg(workers=2, chunk_size=64).centerpoint(points)
+        nptest.assert_allclose(cpt, cpt2)
+
+    def test_map_blocks(self):
+        blocks = []
+
+        def double(a):
+            blocks.append(len(a))
+            return a, 2 * a
+
+        # The work is split evenly across the threads.
+        with get_backend(3, "thread") as backend:
+            a, b = backend.map_blocks(double, np.arange(300))
+        self.assertEqual(blocks, [100, 100, 100])
+        nptest.assert_array_equal(b, 2 * np.arange(300))
+
+        blocks = []
+        with get_backend(2, "thread", chunk_size=64) as backend:
+            backend.map_blocks(double, np.arange(300))
+        self.assertEqual(sorted(blocks), [44, 64, 64, 64, 64])
+
+    def test_step_cap(self):
+        # Of the 6 full groups of B_0 only (d + 2) ** (z - 1) = 3 are
+        # popped, their radon points fill B_1 with a single group, whose
+        # radon point is the only one to reach B_z.
+        d, z = 1, 2
+        points = np.random.default_rng(0).normal(size=(18, d))
+        algorithm = IteratedTverberg()
+        B = _Buckets(18, d, z)
+
+        with get_backend(None, "thread") as backend:
+            algorithm._step(B, points, z, backend)
+            self.assertEqual(len(B[1]), d + 2)
+            self.assertGreaterEqual(len(B[0]), 9)
+
+            algorithm._step(B, points, z, backend)
+            self.assertEqual(len(B[2]), 1)
+            self.assertEqual(len(B[1]), 0)
+
+        # Of two full groups of B_z-1 only one is popped.
+        B = _Buckets(18, d, z, proof=False)
+        B.push(1, np.arange(2.0 * (d + 2))[:, None])
+        with get_backend(None, "thread") as backend:
+            IteratedTverberg(proof=False)._step(B, points, z, backend)
+        self.assertEqual(len(B[2]), 1)
+        self.assertEqual(len(B[1]), d + 2)
+        self.assertEqual(len(B[0]), 18)
+
+    def test_buckets(self):
+        d = 2
+        B = _Buckets(10, d, 3)
+        self.assertEqual(B.find_l(), 1)
+
+        # Bulk pops return the stacked items in the order of popping.
+        nptest.assert_array_equal(B.pop(0, 2), [9, 8, 7, 6, 5, 4, 3, 2])
+        self.assertRaises(AssertionError, B.find_l)
+
+        proof = np.zeros((1, 4, d + 1)), np.full((1, 4, d + 1), -1)
+        for i in range(d + 2):
+            B.push(2, np.full((1, d), i), *proof)
+        self.assertEqual(B.find_l(), 3)
+
+        B.push(0, np.arange(4))
+        self.assertEqual(B.find_l(), 3)
+
+        points, alphas, hulls = B.pop(2)
+        nptest.assert_array_equal(points[:, 0], [3, 2, 1, 0])
+        self.assertEqual(alphas.shape, (d + 2, 4, d + 1))
+        self.assertEqual(B.find_l(), 1)
+        self.assertRaises(IndexError, B.pop, 2)
+
+    def test_prune(self):
+        n, k = 200, 30
+        for d in [1, 2, 3, 5]:
+            for degenerate in [False, True]:
+                points = np.random.normal(size=(n, d))
+                if degenerate and d > 1:
+                    # all points are in a hyperplane
+                    points[:, 1] = 2 * points[:, 0]
+
+                m = (d + 2) ** 2
+                hulls = np.array([np.random.choice(n, m, replace=False)
+                                  for _ in range(k)])
+                hulls[:, -2:] = -1
+                alphas = np.random.rand(k, m)
+                alphas[:, 0] = 0
+                alphas[hulls < 0] = 0
+                alphas /= np.sum(alphas, axis=1, keepdims=True)
+
+                _alphas, _hulls, pruned = _prune(alphas.copy(), hulls.copy(),
+                                                 points)
+                self.assertEqual(_hulls.shape, (k, d + 1))
+
+                # The pruned combinations describe the same points.
+                nptest.assert_allclose(
+                    np.einsum("km,kmd->kd", _alphas, points[_hulls]),
+                    np.einsum("km,kmd->kd", alphas, points[hulls]),
+                    atol=1e-10)
+                nptest.assert_allclose(np.sum(_alphas, axis=1), 1)
+                self.assertTrue(np.all(_alphas >= 0))
+
+                # No point is lost or duplicated.
+                self.assertEqual(
+                    sorted(np.concatenate((_hulls[_hulls >= 0], pruned))),
+                    sorted(hulls[hulls >= 0]))
+
     def test_tverberg_1d(self):
         points = np.arange(2000)
         np.random.shuffle(points)
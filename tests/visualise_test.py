@@ -2,8 +2,12 @@ import math
 import unittest
 
 import numpy as np
-from centerpoints.visualise \
-    import Visualisation, Polygons, Points, PointGroups, Gui
+
+try:
+    from centerpoints.visualise \
+        import Visualisation, Polygons, Points, PointGroups, Gui
+except ImportError:
+    raise unittest.SkipTest("PySide isn't installed.")
 
 
 def random_sphere_points(n_points, dim):